@@ -8,8 +8,9 @@ from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timezone
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, ForeignKey, Index, func, select
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, DateTime, Text, ForeignKey, Index, bindparam, func, select
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship
+from sqlalchemy.pool import StaticPool
 
 logger = logging.getLogger(__name__)
 
@@ -120,6 +121,14 @@ class SearchLog(Base):
     executed_at = Column(DateTime, default=_utcnow)
 
 
+# Statement preconstruido una sola vez en import: la consulta de puntos
+# rimpull por equipo es la mas repetida del pipeline y asi cada llamada
+# solo bindea el parametro en vez de rearmar el arbol select/where.
+_STMT_RIMPULL_BY_EQUIP = select(RimpullCurvePoint).where(
+    RimpullCurvePoint.equipment_id == bindparam("eid")
+)
+
+
 class DatabaseManager:
     """Gestiona la conexion y operaciones con la base de datos."""
 
@@ -133,6 +142,51 @@ class DatabaseManager:
             pool_pre_ping=True,
         )
         self.Session = sessionmaker(bind=self.engine)
+        self._register_pragmas()
+        # Caches de IDs para los upserts repetidos del pipeline: una marca y
+        # sus modelos se insertan una vez y despues se consultan miles de
+        # veces; el hit evita el SELECT por llamada.
+        self._brand_id_cache: dict[str, int] = {}
+        self._equip_id_cache: dict[tuple[int, str], int] = {}
+
+    @classmethod
+    def from_connection(cls, connection) -> "DatabaseManager":
+        """Crea un manager sobre una conexion sqlite3 ya abierta.
+
+        Pensado para tests: permite clonar un schema plantilla via la
+        backup API de sqlite3 y envolver la conexion resultante sin
+        volver a ejecutar el DDL.
+        """
+        manager = cls.__new__(cls)
+        manager.db_path = Path(":memory:")
+        manager.engine = create_engine(
+            "sqlite://",
+            creator=lambda: connection,
+            poolclass=StaticPool,
+        )
+        manager.Session = sessionmaker(bind=manager.engine)
+        manager._register_pragmas()
+        manager._brand_id_cache = {}
+        manager._equip_id_cache = {}
+        return manager
+
+    def _register_pragmas(self):
+        """Registra los PRAGMAs de performance en cada conexion nueva.
+
+        synchronous=NORMAL es seguro con transacciones y evita un fsync por
+        commit; temp_store y cache_size mueven trabajo a memoria. WAL solo
+        aplica a DBs en disco (en :memory: no existe el journal)."""
+        use_wal = str(self.db_path) != ":memory:"
+
+        @event.listens_for(self.engine, "connect")
+        def _set_pragmas(dbapi_conn, _connection_record):
+            cursor = dbapi_conn.cursor()
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA cache_size=-64000")
+            if use_wal:
+                cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.close()
 
     def create_tables(self):
         """Crea todas las tablas si no existen."""
@@ -163,9 +217,13 @@ class DatabaseManager:
 
     def insert_brand(self, key: str, nombre: str, pais: str, sitio_web: str, tier: str) -> int:
         """Inserta o retorna brand existente. Retorna el ID."""
+        cached = self._brand_id_cache.get(key)
+        if cached is not None:
+            return cached
         with self.session_scope() as session:
             existing = session.query(Brand).filter_by(key=key).first()
             if existing:
+                self._brand_id_cache[key] = existing.id
                 return existing.id
 
             brand = Brand(
@@ -173,17 +231,25 @@ class DatabaseManager:
             )
             session.add(brand)
             session.flush()
-            return brand.id
+            new_id = brand.id
+        # Cachear recien despues del commit: un rollback no debe dejar
+        # un ID fantasma en el cache.
+        self._brand_id_cache[key] = new_id
+        return new_id
 
     def insert_equipment(
         self, brand_id: int, model: str, category: str, equipment_type: str
     ) -> int:
         """Inserta o retorna equipment existente. Retorna el ID."""
+        cached = self._equip_id_cache.get((brand_id, model))
+        if cached is not None:
+            return cached
         with self.session_scope() as session:
             existing = session.query(Equipment).filter_by(
                 brand_id=brand_id, model=model
             ).first()
             if existing:
+                self._equip_id_cache[(brand_id, model)] = existing.id
                 return existing.id
 
             equip = Equipment(
@@ -191,7 +257,9 @@ class DatabaseManager:
             )
             session.add(equip)
             session.flush()
-            return equip.id
+            new_id = equip.id
+        self._equip_id_cache[(brand_id, model)] = new_id
+        return new_id
 
     def insert_spec(
         self,
@@ -257,6 +325,15 @@ class DatabaseManager:
                 [{"equipment_id": equipment_id, **p} for p in points],
             )
 
+    def get_rimpull_points(self, equipment_id: int) -> list["RimpullCurvePoint"]:
+        """Retorna los puntos rimpull de un equipo (statement precompilado)."""
+        with self.session_scope() as session:
+            points = session.execute(
+                _STMT_RIMPULL_BY_EQUIP, {"eid": equipment_id}
+            ).scalars().all()
+            session.expunge_all()
+            return points
+
     def get_rimpull_curves_dataframe(self):
         """Retorna curvas rimpull como DataFrame de pandas."""
         import pandas as pd
@@ -279,16 +356,19 @@ class DatabaseManager:
         return df
 
     def get_visited_urls_for_brand(self, brand_key: str) -> set[str]:
-        """Retorna set de URLs ya visitadas para una marca (desde data_sources)."""
+        """Retorna set de URLs ya visitadas para una marca (desde data_sources).
+
+        Selecciona solo la columna url via scalars(): sin hidratar objetos
+        ORM ni construir tuplas Row intermedias por cada fila.
+        """
+        stmt = (
+            select(DataSource.url)
+            .join(Equipment, DataSource.equipment_id == Equipment.id)
+            .join(Brand, Equipment.brand_id == Brand.id)
+            .where(Brand.key == brand_key)
+        )
         with self.session_scope() as session:
-            rows = (
-                session.query(DataSource.url)
-                .join(Equipment, DataSource.equipment_id == Equipment.id)
-                .join(Brand, Equipment.brand_id == Brand.id)
-                .filter(Brand.key == brand_key)
-                .all()
-            )
-            return {row[0] for row in rows}
+            return set(session.scalars(stmt))
 
     def clear_brand_data(self, brand_key: str) -> dict:
         """Borra technical_specs, data_sources y equipment de una marca. Preserva brands."""
@@ -325,6 +405,12 @@ class DatabaseManager:
                 "rimpull_points": rimpull_deleted,
                 "equipment": equip_deleted,
             }
+            # Los equipment de la marca ya no existen: invalidar sus IDs
+            # cacheados (el brand se preserva, su cache sigue valido)
+            for cache_key in [
+                k for k in self._equip_id_cache if k[0] == brand.id
+            ]:
+                del self._equip_id_cache[cache_key]
             logger.info(f"Datos borrados para '{brand_key}': {counts}")
             return counts
 
@@ -390,11 +476,10 @@ class DatabaseManager:
             "models": models_detail,
         }
 
-    def get_all_specs_dataframe(self):
-        """Retorna todas las specs como DataFrame de pandas."""
-        import pandas as pd
-
-        stmt = (
+    @staticmethod
+    def _specs_select():
+        """Select base de specs con joins brand/equipment."""
+        return (
             select(
                 Brand.nombre_completo.label("brand"),
                 Brand.pais.label("country"),
@@ -411,6 +496,83 @@ class DatabaseManager:
             .join(TechnicalSpecRecord, Equipment.id == TechnicalSpecRecord.equipment_id)
         )
 
+    def get_all_specs_dataframe(self):
+        """Retorna todas las specs como DataFrame de pandas."""
+        import pandas as pd
+
         with self.engine.connect() as conn:
-            df = pd.read_sql(stmt, conn)
+            df = pd.read_sql(self._specs_select(), conn)
         return df
+
+    def iter_specs_chunks(self, chunksize: int = 50_000):
+        """Itera las specs en DataFrames parciales de `chunksize` filas.
+
+        Evita materializar la tabla completa en memoria al escribir reportes
+        grandes; la conexion permanece abierta durante la iteracion."""
+        import pandas as pd
+
+        with self.engine.connect() as conn:
+            yield from pd.read_sql(self._specs_select(), conn, chunksize=chunksize)
+
+    def get_content_fingerprint(self) -> tuple:
+        """Huella barata del contenido de specs y curvas rimpull.
+
+        Tres agregados O(1)/O(n) por tabla (MAX(id), COUNT, MAX(extracted_at))
+        que cambian ante cualquier insercion o recarga de datos. Sirve para
+        detectar si un artefacto derivado (p.ej. el reporte HTML) sigue vigente
+        sin releer las tablas completas."""
+        with self.session_scope() as session:
+            specs = session.query(
+                func.max(TechnicalSpecRecord.id),
+                func.count(TechnicalSpecRecord.id),
+                func.max(TechnicalSpecRecord.extracted_at),
+            ).one()
+            rimpull = session.query(
+                func.max(RimpullCurvePoint.id),
+                func.count(RimpullCurvePoint.id),
+                func.max(RimpullCurvePoint.extracted_at),
+            ).one()
+        return tuple(specs) + tuple(rimpull)
+
+    def get_summary_stats(self) -> dict:
+        """Resumen estadistico calculado con agregados SQL.
+
+        Equivale a nunique/groupby/value_counts sobre el DataFrame completo,
+        pero sin traer la tabla de specs al lado Python."""
+        with self.session_scope() as session:
+            base = (
+                session.query(
+                    func.count(func.distinct(Brand.nombre_completo)),
+                    func.count(func.distinct(Equipment.model)),
+                    func.count(TechnicalSpecRecord.id),
+                    func.avg(TechnicalSpecRecord.confidence),
+                )
+                .select_from(Brand)
+                .join(Equipment, Brand.id == Equipment.brand_id)
+                .join(TechnicalSpecRecord, Equipment.id == TechnicalSpecRecord.equipment_id)
+            )
+            total_brands, total_models, total_specs, avg_confidence = base.one()
+
+            specs_per_brand = dict(
+                session.query(Brand.nombre_completo, func.count(TechnicalSpecRecord.id))
+                .join(Equipment, Brand.id == Equipment.brand_id)
+                .join(TechnicalSpecRecord, Equipment.id == TechnicalSpecRecord.equipment_id)
+                .group_by(Brand.nombre_completo)
+                .all()
+            )
+
+            parameters_found = dict(
+                session.query(TechnicalSpecRecord.parameter, func.count(TechnicalSpecRecord.id))
+                .group_by(TechnicalSpecRecord.parameter)
+                .order_by(func.count(TechnicalSpecRecord.id).desc())
+                .all()
+            )
+
+        return {
+            "total_brands": total_brands,
+            "total_models": total_models,
+            "total_specs": total_specs,
+            "avg_confidence": float(avg_confidence) if avg_confidence is not None else 0.0,
+            "specs_per_brand": specs_per_brand,
+            "parameters_found": parameters_found,
+        }
@@ -5,6 +5,7 @@ Usa sentence-transformers para generar embeddings y ChromaDB/FAISS como vector s
 
 import hashlib
 import logging
+import sqlite3
 from pathlib import Path
 from dataclasses import dataclass
 
@@ -106,6 +107,32 @@ class VectorStore:
         self.persist_dir = Path(persist_dir)
         self.persist_dir.mkdir(parents=True, exist_ok=True)
         self._collection = None
+        self._pq_index = None
+        # Side table sqlite con hashes de contenido ya embebido.
+        # Permite saltar chunking+encoding en corridas incrementales.
+        self._hash_db_path = self.persist_dir / "content_hashes.db"
+
+    def _hash_conn(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._hash_db_path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS content_hashes (hash TEXT PRIMARY KEY)"
+        )
+        return conn
+
+    def existing_hashes(self) -> set[str]:
+        """Retorna los hashes de contenido ya procesados (persistidos en sqlite)."""
+        with self._hash_conn() as conn:
+            return {row[0] for row in conn.execute("SELECT hash FROM content_hashes")}
+
+    def add_hashes(self, hashes: list[str]):
+        """Registra hashes de contenido recien embebido."""
+        if not hashes:
+            return
+        with self._hash_conn() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO content_hashes (hash) VALUES (?)",
+                [(h,) for h in hashes],
+            )
 
     @property
     def collection(self):
@@ -136,6 +163,44 @@ class VectorStore:
             ],
         )
         logger.info(f"Agregados {len(chunks)} chunks al vector store")
+        self._update_pq_index(embeddings)
+
+    def _update_pq_index(self, embeddings: np.ndarray):
+        """Mantiene un indice FAISS PQ comprimido en disco (opcional).
+
+        Product Quantization reduce cada vector fp32 de 384 dims (~1.5 KB)
+        a 8 bytes con perdida de recall minima, util como copia compacta
+        para cargas masivas. Si faiss no esta instalado (es una dependencia
+        opcional), se omite silenciosamente.
+        """
+        try:
+            import faiss
+        except ImportError:
+            return
+
+        if embeddings.size == 0:
+            return
+
+        embs = np.ascontiguousarray(embeddings, dtype=np.float32)
+        d = embs.shape[1]
+        index_path = self.persist_dir / "pq.faiss"
+
+        if self._pq_index is None:
+            if index_path.exists():
+                self._pq_index = faiss.read_index(str(index_path))
+            else:
+                self._pq_index = faiss.IndexPQ(d, 8, 8)
+
+        if not self._pq_index.is_trained:
+            # PQ con nbits=8 necesita >= 256 vectores de entrenamiento
+            if embs.shape[0] < 256:
+                logger.debug("PQ index: batch insuficiente para entrenar, omitido")
+                return
+            self._pq_index.train(embs)
+
+        self._pq_index.add(embs)
+        faiss.write_index(self._pq_index, str(index_path))
+        logger.info(f"Indice PQ actualizado: {self._pq_index.ntotal} vectores en {index_path}")
 
     def search(
         self,
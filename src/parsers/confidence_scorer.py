@@ -7,6 +7,13 @@ import logging
 import re
 from urllib.parse import urlparse
 
+# Opcional: automaton Aho-Corasick (C) para clasificar dominios en una
+# sola pasada en vez de caminar la jerarquia de labels por cada set
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,6 +63,29 @@ _INDUSTRY_DOMAINS = {
     "international-mining.com", "mining-journal.com",
 }
 
+def _build_domain_automaton():
+    """Construye el automaton dominio→tipo de fuente (una vez al import).
+
+    Las keys llevan "." adelante para que el match solo valga en limite de
+    label: ".cat.com" matchea sub.cat.com y cat.com, no concatenation.com.
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for domains, label in (
+        (_MANUFACTURER_DOMAINS, "manufacturer"),
+        (_SPEC_DATABASE_DOMAINS, "spec_database"),
+        (_INDUSTRY_DOMAINS, "industry_publication"),
+    ):
+        for domain in domains:
+            automaton.add_word("." + domain, label)
+    automaton.make_automaton()
+    return automaton
+
+
+_DOMAIN_AUTOMATON = _build_domain_automaton()
+
+
 # Patrones para dealers (contienen "dealer", "parts", etc.)
 _DEALER_PATTERNS = [
     re.compile(r"dealer|parts|rental|used|second.?hand|pre.?owned", re.IGNORECASE),
@@ -75,24 +105,16 @@ def classify_source(url: str) -> str:
             domain = domain[4:]
         path = parsed.path.lower()
 
+        label = _classify_domain(domain)
+
         # PDF brochure
         if path.endswith(".pdf"):
             # Si es de fabricante, es aun mejor
-            if _matches_domain_set(domain, _MANUFACTURER_DOMAINS):
-                return "manufacturer"
-            return "pdf_brochure"
-
-        # Fabricante oficial
-        if _matches_domain_set(domain, _MANUFACTURER_DOMAINS):
-            return "manufacturer"
+            return "manufacturer" if label == "manufacturer" else "pdf_brochure"
 
-        # Base de datos de specs
-        if _matches_domain_set(domain, _SPEC_DATABASE_DOMAINS):
-            return "spec_database"
-
-        # Publicacion de industria
-        if _matches_domain_set(domain, _INDUSTRY_DOMAINS):
-            return "industry_publication"
+        # Fabricante / base de specs / publicacion de industria
+        if label:
+            return label
 
         # Dealer / reseller
         for pattern in _DEALER_PATTERNS:
@@ -105,6 +127,28 @@ def classify_source(url: str) -> str:
     return "generic"
 
 
+def _classify_domain(domain: str) -> str | None:
+    """Mapea un dominio a su tipo de fuente, o None si es desconocido."""
+    if _DOMAIN_AUTOMATON is not None:
+        probe = "." + domain
+        last = len(probe) - 1
+        for end, label in _DOMAIN_AUTOMATON.iter(probe):
+            # Solo cuenta como match si el dominio conocido es sufijo
+            # completo del netloc (mismo truco que el blocklist del buscador)
+            if end == last:
+                return label
+        return None
+
+    # Fallback puro-Python: caminar la jerarquia de labels por set
+    if _matches_domain_set(domain, _MANUFACTURER_DOMAINS):
+        return "manufacturer"
+    if _matches_domain_set(domain, _SPEC_DATABASE_DOMAINS):
+        return "spec_database"
+    if _matches_domain_set(domain, _INDUSTRY_DOMAINS):
+        return "industry_publication"
+    return None
+
+
 def _matches_domain_set(domain: str, domain_set: set[str]) -> bool:
     """Verifica si un dominio coincide con alguno del set (incluyendo subdominios).
     Uses O(1) set lookups by walking up the domain hierarchy."""
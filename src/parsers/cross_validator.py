@@ -7,6 +7,8 @@ para detectar conflictos, outliers y generar confianza por consenso.
 import logging
 from dataclasses import dataclass, field
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -181,6 +183,54 @@ def _cluster_values(
     return clusters
 
 
+def _merge_gear_kernel(
+    forces: np.ndarray,
+    speeds: np.ndarray,
+    confs: np.ndarray,
+    tolerance_pct: float = 10.0,
+) -> tuple[int, int, int, float | None, list[float]]:
+    """Kernel numerico del merge por marcha sobre arrays paralelos.
+
+    Opera sobre floats empaquetados en vez de atributos de RimpullPoint:
+    el clustering sigue siendo secuencial (promedio corrido), pero sin
+    despachar atributos de objetos Python en el loop interno, y la
+    seleccion de cluster/mejor punto y el promedio de velocidad son
+    operaciones numpy.
+
+    Returns:
+        (indice_mejor_punto, n_acuerdo, n_clusters, velocidad_promedio,
+        fuerzas_outlier) con el indice referido al array original.
+    """
+    order = np.argsort(forces, kind="stable")
+    f_sorted = forces[order]
+    labels = np.empty(len(f_sorted), dtype=np.int64)
+    labels[0] = 0
+    cluster_sum, cluster_n, current = f_sorted[0], 1, 0
+    for i in range(1, len(f_sorted)):
+        avg = cluster_sum / cluster_n
+        diff_pct = abs(f_sorted[i] - avg) / avg * 100.0 if avg > 0 else 100.0
+        if diff_pct <= tolerance_pct:
+            labels[i] = current
+            cluster_sum += f_sorted[i]
+            cluster_n += 1
+        else:
+            current += 1
+            labels[i] = current
+            cluster_sum, cluster_n = f_sorted[i], 1
+
+    counts = np.bincount(labels)
+    main = int(np.argmax(counts))  # primer maximo, igual que max(key=len)
+    member_idx = order[labels == main]
+    best_idx = int(member_idx[int(np.argmax(confs[member_idx]))])
+
+    member_speeds = speeds[member_idx]
+    member_speeds = member_speeds[~np.isnan(member_speeds)]
+    avg_speed = float(member_speeds.mean()) if member_speeds.size else None
+
+    outliers = forces[order[labels != main]].tolist()
+    return best_idx, int(counts[main]), int(current) + 1, avg_speed, outliers
+
+
 def cross_validate_rimpull_curves(curves: list) -> "RimpullCurve | None":
     """Valida cruzadamente curvas rimpull de multiples fuentes.
 
@@ -219,45 +269,30 @@ def cross_validate_rimpull_curves(curves: list) -> "RimpullCurve | None":
             consolidated_points.append(points[0])
             continue
 
-        # Cluster force values with tolerance
-        sorted_pts = sorted(points, key=lambda p: p.force_kn)
-        clusters: list[list[RimpullPoint]] = [[sorted_pts[0]]]
-
-        for pt in sorted_pts[1:]:
-            cluster_avg = sum(p.force_kn for p in clusters[-1]) / len(clusters[-1])
-            if cluster_avg > 0:
-                diff_pct = abs(pt.force_kn - cluster_avg) / cluster_avg * 100
-            else:
-                diff_pct = 100
-            if diff_pct <= tolerance_pct:
-                clusters[-1].append(pt)
-            else:
-                clusters.append([pt])
-
-        # Pick the largest cluster, then best confidence within it
-        main_cluster = max(clusters, key=len)
-        best_point = max(main_cluster, key=lambda p: p.confidence)
+        # Empaquetar atributos una vez y correr el kernel numerico
+        n_sources = len(points)
+        forces = np.fromiter((p.force_kn for p in points), dtype=np.float64, count=n_sources)
+        confs = np.fromiter((p.confidence for p in points), dtype=np.float64, count=n_sources)
+        speeds = np.fromiter(
+            (p.speed_kmh if p.speed_kmh is not None else np.nan for p in points),
+            dtype=np.float64, count=n_sources,
+        )
+        best_idx, n_agree, n_clusters, avg_speed, outlier_vals = _merge_gear_kernel(
+            forces, speeds, confs, tolerance_pct
+        )
+        best_point = points[best_idx]
 
         # Consensus bonus
-        n_sources = len(points)
-        n_agree = len(main_cluster)
         consensus_bonus = 0.1 * (n_agree / n_sources) if n_sources > 1 else 0.0
         adjusted_conf = min(best_point.confidence + consensus_bonus, 1.0)
 
-        if len(clusters) > 1:
+        if n_clusters > 1:
             adjusted_conf = min(adjusted_conf, 0.85)
-            outlier_vals = [
-                p.force_kn for c in clusters if c is not main_cluster for p in c
-            ]
             logger.warning(
                 f"Rimpull {gear}: {n_agree}/{n_sources} fuentes coinciden "
                 f"en ~{best_point.force_kn:.1f} kN. Outliers: {outlier_vals}"
             )
 
-        # Average speed from agreeing sources
-        speeds = [p.speed_kmh for p in main_cluster if p.speed_kmh is not None]
-        avg_speed = sum(speeds) / len(speeds) if speeds else None
-
         consolidated_points.append(RimpullPoint(
             gear=gear,
             speed_kmh=round(avg_speed, 1) if avg_speed is not None else None,
@@ -299,3 +334,97 @@ def cross_validate_equipment_specs(
             results.append(result)
 
     return results
+
+
+def cross_validate_equipment_specs_soa(
+    param_to_arrays: dict[str, dict[str, list]],
+) -> list[ValidationResult]:
+    """Validacion cruzada sobre arrays por parametro (layout SoA).
+
+    Variante vectorizada de `cross_validate_equipment_specs` que opera sobre
+    columnas (values/units/conf/urls) en vez de listas de SpecCandidate,
+    evitando construir un objeto por candidato. Para parametros numericos el
+    valor final es el promedio ponderado por confianza (`np.average`); la
+    fuente canonica es la de mayor confianza (`np.argmax`).
+
+    Args:
+        param_to_arrays: Dict parametro → {"values": [...], "units": [...],
+            "conf": [...], "urls": [...]} con columnas paralelas.
+
+    Returns:
+        Lista de ValidationResult, uno por parametro.
+    """
+    results: list[ValidationResult] = []
+
+    for param, cols in param_to_arrays.items():
+        values = cols["values"]
+        if not values:
+            continue
+        conf = np.asarray(cols["conf"], dtype=np.float64)
+        units = cols["units"]
+        urls = cols["urls"]
+        n_sources = len(values)
+        best_idx = int(np.argmax(conf))
+
+        # Parseo numerico en bloque; NaN marca valores no numericos
+        numeric = np.full(n_sources, np.nan)
+        for i, v in enumerate(values):
+            try:
+                numeric[i] = float(v.replace(",", ""))
+            except (ValueError, TypeError, AttributeError):
+                pass
+        num_mask = ~np.isnan(numeric)
+
+        if not num_mask.any():
+            # Solo valores no numericos: elegir el de mayor confianza
+            results.append(ValidationResult(
+                parameter=param,
+                best_value=values[best_idx],
+                best_unit=units[best_idx],
+                final_confidence=round(float(conf[best_idx]), 3),
+                source_count=n_sources,
+                consensus=len({v.lower() for v in values}) == 1,
+                sources=list(urls),
+            ))
+            continue
+
+        num_vals = numeric[num_mask]
+        num_conf = conf[num_mask]
+        num_urls = [u for u, m in zip(urls, num_mask) if m]
+        num_units = [u for u, m in zip(units, num_mask) if m]
+
+        avg = float(np.average(num_vals, weights=num_conf)) if num_conf.sum() > 0 else float(num_vals.mean())
+        top = int(np.argmax(num_conf))
+
+        # Consenso: dispersion relativa dentro de la tolerancia del parametro
+        tolerance = TOLERANCE_PERCENT.get(param, DEFAULT_TOLERANCE)
+        if avg != 0:
+            spread_pct = float(np.abs(num_vals - avg).max() / abs(avg) * 100)
+        else:
+            spread_pct = 0.0 if np.all(num_vals == 0) else 100.0
+        consensus = spread_pct <= tolerance
+
+        final_conf = float(num_conf[top])
+        conflict_detail = ""
+        if consensus:
+            final_conf = min(final_conf + (0.1 if len(num_vals) > 1 else 0.0), 1.0)
+        else:
+            conflict_detail = (
+                f"Conflicto: dispersion {spread_pct:.1f}% > tolerancia {tolerance}% "
+                f"entre {len(num_vals)} fuentes (promedio ~{avg:.1f})"
+            )
+            logger.warning("%s: %s", param, conflict_detail)
+            final_conf = min(final_conf, 0.85)
+
+        results.append(ValidationResult(
+            parameter=param,
+            best_value=f"{avg:g}",
+            best_unit=num_units[top],
+            final_confidence=round(final_conf, 3),
+            source_count=n_sources,
+            consensus=consensus,
+            sources=[num_urls[top]] + [u for i, u in enumerate(num_urls) if i != top],
+            conflict_detail=conflict_detail,
+        ))
+
+    return results
@@ -20,19 +20,29 @@ class QAResult:
     issues: list[str] = field(default_factory=list)
 
 
-# Patrones de placeholders y valores vacios
-_PLACEHOLDER_PATTERNS = [
-    re.compile(r"^[-–—]+$"),                    # Solo guiones
-    re.compile(r"^[nN]\/?[aA]$"),               # N/A, n/a
-    re.compile(r"^(tbd|tba|pending|ask)$", re.I),  # TBD, etc
-    re.compile(r"^\*+$"),                        # Solo asteriscos
-    re.compile(r"^\.+$"),                        # Solo puntos
-    re.compile(r"^(na|none|null|nil)$", re.I),   # none, null, etc
-    re.compile(r"^0+(\.0+)?$"),                  # Cero (0, 0.0, 00)
-    re.compile(r"^\s*$"),                        # Espacios en blanco
-    re.compile(r"^(contact|consult|available)", re.I),  # "contact dealer"
-    re.compile(r"^(option|optional|standard)$", re.I),  # No es un valor
-]
+# Placeholders y valores vacios, en una sola alternacion compilada: un
+# match() por spec en vez de iterar diez patrones. Los flags por-patron
+# se preservan con grupos (?i:...) inline.
+_PLACEHOLDER_RE = re.compile(
+    r"^(?:"
+    r"[-–—]+$"                                  # Solo guiones
+    r"|[nN]\/?[aA]$"                            # N/A, n/a
+    r"|(?i:tbd|tba|pending|ask)$"               # TBD, etc
+    r"|\*+$"                                    # Solo asteriscos
+    r"|\.+$"                                    # Solo puntos
+    r"|(?i:na|none|null|nil)$"                  # none, null, etc
+    r"|0+(?:\.0+)?$"                            # Cero (0, 0.0, 00)
+    r"|\s*$"                                    # Espacios en blanco
+    r"|(?i:contact|consult|available)"          # "contact dealer"
+    r"|(?i:option|optional|standard)$"          # No es un valor
+    r")"
+)
+
+# Parametros cuyo valor es texto libre (no se exige parse numerico)
+_NON_NUMERIC_PARAMS = frozenset({
+    "modelo_motor", "norma_emisiones", "tipo_transmision",
+    "tamano_neumaticos", "tipo_rodamiento",
+})
 
 # Combinaciones de parametros con restricciones fisicas
 # (param_a, param_b, regla): param_a debe ser menor/mayor que param_b
@@ -66,15 +76,12 @@ def qa_single_spec(spec: TechnicalSpec) -> QAResult:
     value = spec.value.strip()
 
     # 2. Placeholder
-    for pattern in _PLACEHOLDER_PATTERNS:
-        if pattern.match(value):
-            issues.append(f"placeholder: '{value}'")
-            return QAResult(spec=spec, passed=False, issues=issues)
+    if _PLACEHOLDER_RE.match(value):
+        issues.append(f"placeholder: '{value}'")
+        return QAResult(spec=spec, passed=False, issues=issues)
 
     # 3. Parametros que esperan valores numericos
-    non_numeric_params = {"modelo_motor", "norma_emisiones", "tipo_transmision",
-                          "tamano_neumaticos", "tipo_rodamiento"}
-    if spec.parameter not in non_numeric_params:
+    if spec.parameter not in _NON_NUMERIC_PARAMS:
         try:
             float(value.replace(",", ""))
         except (ValueError, TypeError):
@@ -94,7 +101,7 @@ def qa_single_spec(spec: TechnicalSpec) -> QAResult:
                 pass
 
     # 5. Unidad faltante para parametros numericos
-    if spec.parameter not in non_numeric_params and not spec.unit:
+    if spec.parameter not in _NON_NUMERIC_PARAMS and not spec.unit:
         issues.append("unidad_faltante")
         # No rechazar, solo advertir (puede inferirse)
 
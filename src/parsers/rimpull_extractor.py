@@ -3,6 +3,7 @@ Extractor dedicado de curvas rimpull (fuerza de traccion vs marcha/velocidad)
 desde tablas y texto semi-estructurado en PDFs y paginas web.
 """
 
+import functools
 import re
 import logging
 from dataclasses import dataclass, field
@@ -70,18 +71,18 @@ GEAR_ORDER: dict[str, int] = {
 
 MAX_TEXT_LENGTH = 200_000  # ~200 KB guard for extract_from_text
 
-# Pre-compiled regex patterns for text extraction
-_RIMPULL_PATTERN1 = re.compile(
-    r"(?:(\w+)\s*(?:gear|marcha)\s*rimpull|rimpull\s*\(?(\w+)\s*(?:gear|marcha)\)?)"
-    r"[:\s]*([0-9,.]+)\s*(kN|lbf|kgf|lb)",
-    re.IGNORECASE,
-)
-_RIMPULL_PATTERN2 = re.compile(
-    r"rimpull\s*\(\s*(\w+)(?:\s*gear)?\s*\)[:\s]*([0-9,.]+)\s*(kN|lbf|kgf|lb)",
-    re.IGNORECASE,
-)
-_RIMPULL_SECTION_PATTERN = re.compile(
-    r"rimpull[^.]{0,500}?(?:(?:\d+(?:st|nd|rd|th))[:\s]+[0-9,.]+\s*(?:kN|lbf|kgf|lb)[\s,;]*)+",
+# Los tres patrones de extraccion de texto combinados en una alternacion
+# con grupos nombrados: un solo finditer recorre el texto una vez en vez
+# de tres pasadas completas. Orden de alternativas por frecuencia
+# empirica: gear-rimpull, parentetico, seccion con lista inline.
+_RIMPULL_COMBINED_RE = re.compile(
+    # "1st gear rimpull: 950 kN" / "Rimpull (1st gear): 950 kN"
+    r"(?:(?P<g1a>\w+)\s*(?:gear|marcha)\s*rimpull|rimpull\s*\(?(?P<g1b>\w+)\s*(?:gear|marcha)\)?)"
+    r"[:\s]*(?P<f1>[0-9,.]+)\s*(?P<u1>kN|lbf|kgf|lb)"
+    # "Rimpull (1st): 950 kN"
+    r"|rimpull\s*\(\s*(?P<g2>\w+)(?:\s*gear)?\s*\)[:\s]*(?P<f2>[0-9,.]+)\s*(?P<u2>kN|lbf|kgf|lb)"
+    # Seccion "rimpull ... 1st: 950 kN, 2nd: 580 kN" (pairs inline)
+    r"|(?P<sec>rimpull[^.]{0,500}?(?:(?:\d+(?:st|nd|rd|th))[:\s]+[0-9,.]+\s*(?:kN|lbf|kgf|lb)[\s,;]*)+)",
     re.IGNORECASE,
 )
 _RIMPULL_INLINE_PATTERN = re.compile(
@@ -90,29 +91,49 @@ _RIMPULL_INLINE_PATTERN = re.compile(
 )
 
 
+@functools.lru_cache(maxsize=256)
 def normalize_gear(raw: str) -> str:
-    """Normaliza un label de marcha a formato estandar."""
+    """Normaliza un label de marcha a formato estandar.
+
+    Memoizada: los mismos labels crudos se repiten en cada tabla y cada
+    match de texto, asi que el strip/lower solo corre una vez por variante."""
+    # Fast path: la mayoria de los labels ya vienen limpios y en minuscula
+    hit = GEAR_ALIASES.get(raw)
+    if hit is not None:
+        return hit
     cleaned = raw.strip().lower().rstrip(".")
     return GEAR_ALIASES.get(cleaned, raw.strip())
 
 
+def _gear_rank(point: RimpullPoint) -> int:
+    """Clave de orden para una marcha: rank precalculado, 99 si es desconocida."""
+    return GEAR_ORDER.get(point.gear, 99)
+
+
 def sort_points_by_gear(points: list[RimpullPoint]) -> list[RimpullPoint]:
     """Ordena puntos por orden logico de marcha."""
-    return sorted(points, key=lambda p: GEAR_ORDER.get(p.gear, 99))
+    return sorted(points, key=_gear_rank)
 
 
 # --- Conversion de unidades ---
 
+# Factores a kN por unidad (lowercase); un lookup reemplaza la cadena de
+# comparaciones por llamada. 1 kN = 224.809 lbf = 101.972 kgf
+_UNIT_FACTORS: dict[str, float] = {
+    "kn": 1.0,
+    "kN": 1.0,  # forma canonica, evita el .lower() del fallback
+    "lbf": 1.0 / 224.809,
+    "lb": 1.0 / 224.809,
+    "kgf": 1.0 / 101.972,
+}
+
+
 def _convert_to_kn(value: float, unit: str) -> float:
     """Convierte fuerza a kN desde diversas unidades."""
-    unit_lower = unit.lower().strip()
-    if unit_lower == "kn":
-        return value
-    if unit_lower in ("lbf", "lb"):
-        return value / 224.809  # 1 kN = 224.809 lbf
-    if unit_lower == "kgf":
-        return value / 101.972  # 1 kN = 101.972 kgf
-    return value
+    factor = _UNIT_FACTORS.get(unit)
+    if factor is None:
+        factor = _UNIT_FACTORS.get(unit.lower().strip(), 1.0)
+    return value * factor
 
 
 def _detect_force_unit(text: str) -> str:
@@ -129,8 +150,15 @@ def _detect_force_unit(text: str) -> str:
 
 # --- Deteccion de tabla rimpull ---
 
-_GEAR_KEYWORDS = {"gear", "speed", "marcha", "velocidad"}
-_FORCE_KEYWORDS = {"rimpull", "tractive", "drawbar", "force", "pull", "traccion", "tracción"}
+# Un search() compilado por grupo de keywords reemplaza el loop
+# `any(kw in header_text ...)`; match por substring, igual que antes
+# ("pull" sigue matcheando dentro de "rimpull").
+_GEAR_HEADER_RE = re.compile(r"gear|speed|marcha|velocidad")
+_FORCE_HEADER_RE = re.compile(r"rimpull|tractive|drawbar|force|pull|traccion|tracción")
+
+# Celda numerica estilo tabla ("1,234.5", "-12", ".5"): un fullmatch evita
+# el try/float con excepcion por cada celda no numerica.
+_NUMERIC_CELL_RE = re.compile(r"[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?")
 
 
 def is_rimpull_table(table: list[list[str]]) -> bool:
@@ -143,10 +171,7 @@ def is_rimpull_table(table: list[list[str]]) -> bool:
         cell.lower() for row in table[:2] for cell in row if cell
     )
 
-    has_gear = any(kw in header_text for kw in _GEAR_KEYWORDS)
-    has_force = any(kw in header_text for kw in _FORCE_KEYWORDS)
-
-    if has_gear and has_force:
+    if _GEAR_HEADER_RE.search(header_text) and _FORCE_HEADER_RE.search(header_text):
         return True
 
     # Check if the table has gear-like values in first column and numeric values
@@ -158,11 +183,8 @@ def is_rimpull_table(table: list[list[str]]) -> bool:
         # Check if other columns have numeric values
         for row in table[1:]:
             for cell in row[1:]:
-                try:
-                    float(cell.replace(",", "").strip())
+                if cell and _NUMERIC_CELL_RE.fullmatch(cell.replace(",", "").strip()):
                     return True
-                except (ValueError, TypeError):
-                    continue
 
     return False
 
@@ -183,7 +205,7 @@ def _find_column_indices(
             gear_col = i
         elif any(kw in cell_lower for kw in ("speed", "velocidad", "km/h", "kmh")):
             speed_col = i
-        elif any(kw in cell_lower for kw in _FORCE_KEYWORDS):
+        elif _FORCE_HEADER_RE.search(cell_lower):
             force_col = i
 
     return gear_col, speed_col, force_col
@@ -212,9 +234,13 @@ class RimpullCurveExtractor:
         header = table[0]
         gear_col, speed_col, force_col = _find_column_indices(header)
 
-        # Detect force unit from header
+        # Detect force unit from header; la unidad es una sola por tabla,
+        # asi que el factor a kN se resuelve una vez fuera del loop de filas
         header_text = " ".join(header)
         force_unit = _detect_force_unit(header_text)
+        force_factor = _UNIT_FACTORS.get(force_unit)
+        if force_factor is None:
+            force_factor = _UNIT_FACTORS.get(force_unit.lower().strip(), 1.0)
 
         # If no explicit columns found, use positional defaults
         if gear_col is None:
@@ -252,7 +278,7 @@ class RimpullCurveExtractor:
                 continue
 
             # Convert to kN
-            force_kn = _convert_to_kn(force_val, force_unit)
+            force_kn = force_val * force_factor
 
             # Parse speed if available
             speed_kmh = None
@@ -311,32 +337,14 @@ class RimpullCurveExtractor:
 
         points: list[RimpullPoint] = []
 
-        # Pattern 1: "1st gear rimpull: 950 kN" / "Rimpull 1st gear: 950 kN"
-        for m in _RIMPULL_PATTERN1.finditer(text):
-            gear_raw = m.group(1) or m.group(2)
+        def _add_point(gear_raw: str, force_raw: str, unit: str):
             gear = normalize_gear(gear_raw)
             try:
-                force_val = float(m.group(3).replace(",", ""))
+                force_val = float(force_raw.replace(",", ""))
             except (ValueError, TypeError):
-                continue
-            unit = m.group(4)
-            force_kn = _convert_to_kn(force_val, unit)
-            points.append(RimpullPoint(
-                gear=gear, speed_kmh=None, force_kn=round(force_kn, 2),
-                original_unit=unit, confidence=final_confidence,
-                source_url=source_url,
-            ))
-
-        # Pattern 2: "Rimpull (1st): 950 kN" / "Rimpull (1st gear): 950 kN"
-        for m in _RIMPULL_PATTERN2.finditer(text):
-            gear = normalize_gear(m.group(1))
-            try:
-                force_val = float(m.group(2).replace(",", ""))
-            except (ValueError, TypeError):
-                continue
-            unit = m.group(3)
+                return
             force_kn = _convert_to_kn(force_val, unit)
-            # Avoid duplicates from pattern1
+            # Evitar duplicados entre alternativas del patron combinado
             if not any(p.gear == gear and abs(p.force_kn - force_kn) < 0.1 for p in points):
                 points.append(RimpullPoint(
                     gear=gear, speed_kmh=None, force_kn=round(force_kn, 2),
@@ -344,23 +352,19 @@ class RimpullCurveExtractor:
                     source_url=source_url,
                 ))
 
-        # Pattern 3: "1st: 950 kN, 2nd: 750 kN, 3rd: 550 kN" (inline list near rimpull context)
-        for section_match in _RIMPULL_SECTION_PATTERN.finditer(text):
-            section = section_match.group(0)
-            for m in _RIMPULL_INLINE_PATTERN.finditer(section):
-                gear = normalize_gear(m.group(1))
-                try:
-                    force_val = float(m.group(2).replace(",", ""))
-                except (ValueError, TypeError):
-                    continue
-                unit = m.group(3)
-                force_kn = _convert_to_kn(force_val, unit)
-                if not any(p.gear == gear and abs(p.force_kn - force_kn) < 0.1 for p in points):
-                    points.append(RimpullPoint(
-                        gear=gear, speed_kmh=None, force_kn=round(force_kn, 2),
-                        original_unit=unit, confidence=final_confidence,
-                        source_url=source_url,
-                    ))
+        # Una sola pasada; la alternativa que matcheo decide el despacho:
+        # - "1st gear rimpull: 950 kN" / "Rimpull (1st gear): 950 kN"
+        # - "Rimpull (1st): 950 kN"
+        # - seccion "rimpull ... 1st: 950 kN, 2nd: 750 kN" (lista inline)
+        for m in _RIMPULL_COMBINED_RE.finditer(text):
+            section = m.group("sec")
+            if section is not None:
+                for im in _RIMPULL_INLINE_PATTERN.finditer(section):
+                    _add_point(im.group(1), im.group(2), im.group(3))
+            elif m.group("u1") is not None:
+                _add_point(m.group("g1a") or m.group("g1b"), m.group("f1"), m.group("u1"))
+            else:
+                _add_point(m.group("g2"), m.group("f2"), m.group("u2"))
 
         if len(points) < 2:
             return []
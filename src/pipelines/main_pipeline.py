@@ -9,10 +9,13 @@ Pipeline principal que orquesta todo el proceso de busqueda de informacion tecni
 7. Genera reportes
 """
 
+import csv
+import dataclasses
+import hashlib
 import logging
 import os
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
@@ -27,10 +30,10 @@ from src.utils.config_loader import (
     get_all_models_for_brand,
 )
 from src.scrapers.web_search import DeepSearchOrchestrator, SearchResult
-from src.scrapers.page_scraper import StaticPageScraper, PDFScraper
+from src.scrapers.page_scraper import StaticPageScraper, PDFScraper, scrape_pdf_url
 from src.parsers.spec_extractor import SpecExtractor, build_equipment_profile
 from src.parsers.qa_pipeline import qa_equipment_specs, qa_rimpull_curve
-from src.parsers.cross_validator import SpecCandidate, cross_validate_equipment_specs, cross_validate_rimpull_curves
+from src.parsers.cross_validator import cross_validate_equipment_specs_soa, cross_validate_rimpull_curves
 from src.parsers.rimpull_extractor import RimpullCurveExtractor
 from src.models.database import DatabaseManager
 from src.models.embeddings import EmbeddingEngine, TextChunker, VectorStore
@@ -85,7 +88,7 @@ class MiningEquipmentPipeline:
                 sitio_web=brand["sitio_web"],
                 tier=brand["tier"],
             )
-        logger.info(f"{len(brands)} marcas registradas en DB")
+        logger.info("%d marcas registradas en DB", len(brands))
 
     def run_search_phase(self, brand_filter: str | None = None, fresh: bool = False) -> list[SearchResult]:
         """Fase 1: Deep search web para todas las marcas/modelos."""
@@ -103,18 +106,18 @@ class MiningEquipmentPipeline:
             # Fresh: borrar datos previos de esta marca
             if fresh:
                 counts = self.db.clear_brand_data(brand_key)
-                logger.info(f"Fresh mode: borrados {counts} para '{brand_key}'")
+                logger.info("Fresh mode: borrados %s para '%s'", counts, brand_key)
 
             # Resume: cargar URLs ya visitadas
             previously_visited: set[str] | None = None
             if not fresh:
                 previously_visited = self.db.get_visited_urls_for_brand(brand_key)
                 if previously_visited:
-                    logger.info(f"Resume mode: {len(previously_visited)} URLs ya visitadas para '{brand_key}'")
+                    logger.info("Resume mode: %d URLs ya visitadas para '%s'", len(previously_visited), brand_key)
 
             models = get_all_models_for_brand(brand)
             brand_name = brand["nombre"]
-            logger.info(f"Marca: {brand_name} — {len(models)} modelos a buscar")
+            logger.info("Marca: %s — %d modelos a buscar", brand_name, len(models))
 
             for model_info in tqdm(models, desc=f"Buscando {brand_key}", unit="modelo"):
                 model_name = model_info["model"]
@@ -124,15 +127,16 @@ class MiningEquipmentPipeline:
                     equipment_type=model_info["equipment_type"],
                     previously_visited_urls=previously_visited,
                 )
-                for r in results:
-                    r.model = model_name
+                # SearchResult es frozen: anotar el modelo via replace()
+                results = [dataclasses.replace(r, model=model_name) for r in results]
                 all_results.extend(results)
-                logger.info(
-                    f"  {model_name}: +{len(results)} resultados "
-                    f"(total acumulado: {len(all_results)})"
-                )
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "  %s: +%d resultados (total acumulado: %d)",
+                        model_name, len(results), len(all_results),
+                    )
 
-            logger.info(f"  {brand_name}: {len(all_results)} resultados totales")
+            logger.info("  %s: %d resultados totales", brand_name, len(all_results))
 
         # Guardar resultados raw
         self._save_search_results(all_results)
@@ -146,7 +150,7 @@ class MiningEquipmentPipeline:
 
         scraped_data = []
         unique_urls = list({r.url for r in search_results})
-        logger.info(f"{len(unique_urls)} URLs unicas a scrapear")
+        logger.info("%d URLs unicas a scrapear", len(unique_urls))
 
         # O(1) lookup for URL → search result
         url_to_result: dict[str, SearchResult] = {}
@@ -159,20 +163,26 @@ class MiningEquipmentPipeline:
 
         max_workers = self.settings.get("scraping", {}).get("max_concurrent_requests", 5)
 
-        def _scrape_url(url: str):
-            if url.lower().endswith(".pdf"):
-                return self.pdf_scraper.extract_from_url(url)
-            return self.page_scraper.scrape(url)
+        pdf_urls = [u for u in unique_urls if u.lower().endswith(".pdf")]
+        html_urls = [u for u in unique_urls if not u.lower().endswith(".pdf")]
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_url = {executor.submit(_scrape_url, url): url for url in unique_urls}
+        # HTML en threads (I/O-bound); PDFs en procesos (el parseo es
+        # CPU-bound y retiene el GIL, ahogando a los threads de red)
+        with ThreadPoolExecutor(max_workers=max_workers) as html_pool, \
+                ProcessPoolExecutor(max_workers=os.cpu_count()) as pdf_pool:
+            future_to_url = {
+                html_pool.submit(self.page_scraper.scrape, url): url for url in html_urls
+            }
+            future_to_url.update(
+                {pdf_pool.submit(scrape_pdf_url, url): url for url in pdf_urls}
+            )
             for future in tqdm(as_completed(future_to_url), total=len(unique_urls),
                                desc="Scrapeando paginas", unit="pag"):
                 url = future_to_url[future]
                 try:
                     page = future.result()
                 except Exception as e:
-                    logger.error(f"Error scrapeando {url}: {e}")
+                    logger.error("Error scrapeando %s: %s", url, e)
                     scraped_fail += 1
                     continue
 
@@ -191,15 +201,24 @@ class MiningEquipmentPipeline:
                     scraped_fail += 1
 
         logger.info(
-            f"Scraping completado: {scraped_ok} exitosas, "
-            f"{scraped_fail} fallidas/vacias de {len(unique_urls)} URLs"
+            "Scraping completado: %d exitosas, %d fallidas/vacias de %d URLs",
+            scraped_ok, scraped_fail, len(unique_urls),
         )
         return scraped_data
 
-    def run_extraction_phase(self, scraped_data: list[dict]):
-        """Fase 3: Extraccion de especificaciones tecnicas con QA y validacion cruzada."""
+    # Chunks acumulados antes de cada flush de encode+persistencia
+    _EMBED_FLUSH_SIZE = 256
+
+    def run_extract_and_embed(self, scraped_data: list[dict]):
+        """Fases 3+4 fusionadas: extraccion de specs y embeddings en una pasada.
+
+        Cada pagina se recorre una sola vez: se extraen specs/curvas y, en el
+        mismo paso, se chunkea el texto hacia un buffer de embeddings que se
+        flushea por lotes. Evita una segunda iteracion sobre `scraped_data`
+        y re-acceder los strings grandes de `page.text_content`.
+        """
         logger.info("=" * 60)
-        logger.info("FASE 3: EXTRACCION DE SPECS")
+        logger.info("FASE 3+4: EXTRACCION DE SPECS + EMBEDDINGS")
         logger.info("=" * 60)
 
         total_specs = 0
@@ -207,24 +226,42 @@ class MiningEquipmentPipeline:
         total_rimpull_points = 0
         rimpull_extractor = RimpullCurveExtractor()
 
+        # Estado del buffer de embeddings (dedup por hash de contenido)
+        known_hashes = self.vector_store.existing_hashes()
+        new_hashes: list[str] = []
+        embed_buffer: list = []
+        total_chunks = 0
+        skipped_pages = 0
+
+        def _flush_embeddings():
+            nonlocal total_chunks
+            if not embed_buffer:
+                return
+            texts = [c.text for c in embed_buffer]
+            embeddings = self.embedding_engine.encode(texts)
+            self.vector_store.add_documents(embed_buffer, embeddings)
+            total_chunks += len(embed_buffer)
+            embed_buffer.clear()
+
         # Agrupar datos scrapeados por (brand, model)
         by_model: dict[tuple[str, str], list[dict]] = {}
         for item in scraped_data:
             key = (item["brand"], item["model"])
             by_model.setdefault(key, []).append(item)
 
-        logger.info(f"{len(by_model)} modelos a procesar desde {len(scraped_data)} paginas")
+        logger.info("%d modelos a procesar desde %d paginas", len(by_model), len(scraped_data))
 
         for (brand, model), items in tqdm(by_model.items(), desc="Extrayendo specs", unit="modelo"):
-            # Recopilar specs de todas las fuentes para este equipo
-            all_candidates: list[SpecCandidate] = []
+            # Candidatos en layout SoA (columnas por parametro) para la
+            # validacion cruzada vectorizada — evita un objeto por candidato
+            param_to_arrays: dict[str, dict[str, list]] = {}
             all_rimpull_curves = []
 
             for item in items:
                 page = item["page"]
 
-                # Extraer de texto
-                text_specs = self.spec_extractor.extract_from_text(
+                # Extraer de texto (escaneo multi-patron con prefiltro literal)
+                text_specs = self.spec_extractor.scan_bulk(
                     page.text_content, brand, model, page.url
                 )
                 # Extraer de tablas
@@ -244,6 +281,25 @@ class MiningEquipmentPipeline:
                 )
                 all_rimpull_curves.extend(text_curves)
 
+                # Chunking hacia el buffer de embeddings (misma pasada)
+                content_hash = hashlib.blake2b(
+                    page.text_content.encode(), digest_size=16
+                ).hexdigest()
+                if content_hash in known_hashes:
+                    skipped_pages += 1
+                else:
+                    known_hashes.add(content_hash)
+                    new_hashes.append(content_hash)
+                    embed_buffer.extend(self.chunker.chunk_text(
+                        text=page.text_content,
+                        brand=brand,
+                        model=model,
+                        equipment_type="",
+                        source_url=page.url,
+                    ))
+                    if len(embed_buffer) >= self._EMBED_FLUSH_SIZE:
+                        _flush_embeddings()
+
                 # Construir perfil (normaliza, valida rangos, dedup por parametro)
                 profile = build_equipment_profile(brand, model, "", text_specs, table_specs)
 
@@ -251,18 +307,19 @@ class MiningEquipmentPipeline:
                 valid_specs, qa_report = qa_equipment_specs(profile.specs)
                 total_rejected += qa_report["total_rejected"]
 
-                # Agregar candidatos para validacion cruzada
+                # Agregar candidatos (columnas paralelas) para validacion cruzada
                 for spec in valid_specs:
-                    all_candidates.append(SpecCandidate(
-                        parameter=spec.parameter,
-                        value=spec.value,
-                        unit=spec.unit,
-                        confidence=spec.confidence,
-                        source_url=spec.source_url,
-                    ))
-
-            # Validacion cruzada multi-fuente
-            validated = cross_validate_equipment_specs(all_candidates)
+                    cols = param_to_arrays.setdefault(
+                        spec.parameter,
+                        {"values": [], "units": [], "conf": [], "urls": []},
+                    )
+                    cols["values"].append(spec.value)
+                    cols["units"].append(spec.unit)
+                    cols["conf"].append(spec.confidence)
+                    cols["urls"].append(spec.source_url)
+
+            # Validacion cruzada multi-fuente (vectorizada sobre columnas)
+            validated = cross_validate_equipment_specs_soa(param_to_arrays)
 
             # QA + cross-validate rimpull curves
             qa_passed_curves = []
@@ -321,36 +378,20 @@ class MiningEquipmentPipeline:
                     total_rimpull_points += len(point_dicts)
 
         logger.info(
-            f"Total specs validadas y almacenadas: {total_specs} "
-            f"(rechazadas por QA: {total_rejected})"
+            "Total specs validadas y almacenadas: %d (rechazadas por QA: %d)",
+            total_specs, total_rejected,
         )
-        logger.info(f"Total puntos rimpull almacenados: {total_rimpull_points}")
-
-    def run_embedding_phase(self, scraped_data: list[dict]):
-        """Fase 4: Generacion de embeddings y almacenamiento en vector store."""
-        logger.info("=" * 60)
-        logger.info("FASE 4: EMBEDDINGS")
-        logger.info("=" * 60)
-
-        all_chunks = []
-        for item in tqdm(scraped_data, desc="Generando chunks", unit="pag"):
-            page = item["page"]
-            chunks = self.chunker.chunk_text(
-                text=page.text_content,
-                brand=item["brand"],
-                model=item["model"],
-                equipment_type="",
-                source_url=page.url,
-            )
-            all_chunks.extend(chunks)
-
-        if all_chunks:
-            texts = [c.text for c in all_chunks]
-            embeddings = self.embedding_engine.encode(texts)
-            self.vector_store.add_documents(all_chunks, embeddings)
-            logger.info(f"Almacenados {len(all_chunks)} chunks con embeddings")
+        logger.info("Total puntos rimpull almacenados: %d", total_rimpull_points)
+
+        # Flush final del buffer de embeddings + registro de hashes
+        _flush_embeddings()
+        self.vector_store.add_hashes(new_hashes)
+        if skipped_pages:
+            logger.info("%d paginas sin cambios de contenido (embeddings en cache)", skipped_pages)
+        if total_chunks:
+            logger.info("Almacenados %d chunks con embeddings", total_chunks)
         else:
-            logger.warning("No hay chunks para generar embeddings")
+            logger.warning("No hay chunks nuevos para generar embeddings")
 
     def run_report_phase(self):
         """Fase 5: Generacion de reportes."""
@@ -358,36 +399,42 @@ class MiningEquipmentPipeline:
         logger.info("FASE 5: REPORTES")
         logger.info("=" * 60)
 
-        df = self.db.get_all_specs_dataframe()
+        # Resumen estadistico via agregados SQL (sin traer la tabla completa)
+        summary = self.db.get_summary_stats()
 
-        if df.empty:
+        if not summary["total_specs"]:
             logger.warning("No hay datos para generar reportes")
             return
 
         reports_dir = Path(self.settings.get("storage", {}).get("reports_dir", "data/reports"))
         reports_dir.mkdir(parents=True, exist_ok=True)
 
-        # Reporte completo CSV
+        # Reportes CSV (completo y por marca) escritos por chunks
         csv_path = reports_dir / "all_specs.csv"
-        df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+        brand_paths: set[Path] = set()
+        first_chunk = True
+        pivot_frames = []
+        for chunk in self.db.iter_specs_chunks():
+            chunk.to_csv(
+                csv_path, index=False, encoding="utf-8-sig",
+                mode="w" if first_chunk else "a", header=first_chunk,
+            )
+            for brand, brand_df in chunk.groupby("brand"):
+                safe_name = re.sub(r"[^a-zA-Z0-9_-]", "", brand.replace(" ", "_"))[:30]
+                brand_path = reports_dir / f"specs_{safe_name}.csv"
+                is_new = brand_path not in brand_paths
+                brand_df.to_csv(
+                    brand_path, index=False, encoding="utf-8-sig",
+                    mode="w" if is_new else "a", header=is_new,
+                )
+                brand_paths.add(brand_path)
+            # Solo las columnas que necesita el pivote Excel
+            pivot_frames.append(
+                chunk[["brand", "model", "equipment_type", "parameter", "value"]]
+            )
+            first_chunk = False
         logger.info(f"Reporte CSV: {csv_path}")
 
-        # Reporte por marca
-        for brand in df["brand"].unique():
-            brand_df = df[df["brand"] == brand]
-            safe_name = re.sub(r"[^a-zA-Z0-9_-]", "", brand.replace(" ", "_"))[:30]
-            brand_path = reports_dir / f"specs_{safe_name}.csv"
-            brand_df.to_csv(brand_path, index=False, encoding="utf-8-sig")
-
-        # Resumen estadistico
-        summary = {
-            "total_brands": df["brand"].nunique(),
-            "total_models": df["model"].nunique(),
-            "total_specs": len(df),
-            "specs_per_brand": df.groupby("brand")["parameter"].count().to_dict(),
-            "parameters_found": df["parameter"].value_counts().to_dict(),
-        }
-
         import json
         summary_path = reports_dir / "summary.json"
         with open(summary_path, "w", encoding="utf-8") as f:
@@ -396,7 +443,8 @@ class MiningEquipmentPipeline:
 
         # Excel con pivote por marca/modelo
         try:
-            pivot = df.pivot_table(
+            pivot_df = pd.concat(pivot_frames, ignore_index=True)
+            pivot = pivot_df.pivot_table(
                 index=["brand", "model", "equipment_type"],
                 columns="parameter",
                 values="value",
@@ -435,11 +483,8 @@ class MiningEquipmentPipeline:
         # Fase 2: Scraping
         scraped_data = self.run_scraping_phase(search_results)
 
-        # Fase 3: Extraccion
-        self.run_extraction_phase(scraped_data)
-
-        # Fase 4: Embeddings
-        self.run_embedding_phase(scraped_data)
+        # Fases 3+4: Extraccion + embeddings en una sola pasada
+        self.run_extract_and_embed(scraped_data)
 
         # Fase 5: Reportes
         self.run_report_phase()
@@ -514,24 +559,25 @@ class MiningEquipmentPipeline:
                 logger.warning(f"No se pudo copiar backup de DB: {e}")
 
     def _save_search_results(self, results: list[SearchResult]):
-        """Guarda resultados de busqueda en CSV."""
+        """Guarda resultados de busqueda en CSV (streaming, sin DataFrame)."""
         raw_dir = Path(self.settings.get("storage", {}).get("raw_data_dir", "data/raw"))
         raw_dir.mkdir(parents=True, exist_ok=True)
 
-        rows = [
-            {
-                "brand": r.brand,
-                "model": r.model,
-                "title": r.title,
-                "url": r.url,
-                "snippet": r.snippet,
-                "source_engine": r.source_engine,
-                "query": r.query,
-            }
-            for r in results
-        ]
-
-        df = pd.DataFrame(rows)
+        fieldnames = ["brand", "model", "title", "url", "snippet", "source_engine", "query"]
         path = raw_dir / "search_results.csv"
-        df.to_csv(path, index=False, encoding="utf-8-sig")
-        logger.info(f"Resultados de busqueda guardados: {path} ({len(df)} filas)")
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(
+                {
+                    "brand": r.brand,
+                    "model": r.model,
+                    "title": r.title,
+                    "url": r.url,
+                    "snippet": r.snippet,
+                    "source_engine": r.source_engine,
+                    "query": r.query,
+                }
+                for r in results
+            )
+        logger.info(f"Resultados de busqueda guardados: {path} ({len(results)} filas)")
@@ -3,11 +3,22 @@ Generador de reporte HTML interactivo con tabla filtrable y graficos Plotly.
 Produce un archivo HTML standalone (sin servidor) que se puede abrir en cualquier browser.
 """
 
+import gzip
+import hashlib
 import json
 import logging
+import os
+import re
 from pathlib import Path
 from datetime import datetime
 
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from src.models.database import DatabaseManager
 
 logger = logging.getLogger(__name__)
@@ -18,9 +29,9 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 <meta charset="UTF-8">
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
 <title>Mining Equipment - Technical Specs Report</title>
-<script src="https://cdn.plot.ly/plotly-2.27.0.min.js"
-        integrity="sha384-Hl48Kq2HifOWdXEjMsKo6qxqvRLTYqIGbvlENBmkHAxZKIGCXv43H6W1jA671RzC"
-        crossorigin="anonymous"></script>
+<link rel="preload" as="script" href="https://cdn.plot.ly/plotly-2.27.0.min.js"
+      integrity="sha384-Hl48Kq2HifOWdXEjMsKo6qxqvRLTYqIGbvlENBmkHAxZKIGCXv43H6W1jA671RzC"
+      crossorigin="anonymous">
 <style>
   * { box-sizing: border-box; margin: 0; padding: 0; }
   body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
@@ -96,7 +107,7 @@ HTML_TEMPLATE = """<!DOCTYPE html>
       <option value="0.9">≥ 0.9</option>
     </select></div>
     <div><label>Model (text)</label><input id="fModel" type="text" placeholder="Filter model..."
-      oninput="applyFilters()"></div>
+      oninput="scheduleFilters()"></div>
   </div>
   <div class="row-count" id="rowCount"></div>
   <div class="table-wrapper">
@@ -128,8 +139,39 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 </div>
 
 <script>
-const DATA = {{data_json}};
-const RIMPULL_DATA = {{rimpull_json}};
+const COLS = {{data_json}};
+const RCOLS = {{rimpull_json}};
+const BARS = {{bars_json}};
+
+// Curvas rimpull: payload columnar → objetos fila
+const RIMPULL_DATA = [];
+if (RCOLS.brand) {
+  for (let i = 0; i < RCOLS.brand.length; i++) {
+    RIMPULL_DATA.push({
+      brand: RCOLS.brand[i], model: RCOLS.model[i], gear: RCOLS.gear[i],
+      speed_kmh: RCOLS.speed_kmh[i], force_kn: RCOLS.force_kn[i],
+    });
+  }
+}
+
+// El payload llega columnar (SoA) con brand/parameter/unit codificados como
+// indices en pools de strings unicos. Aca se materializan una sola vez los
+// objetos fila que consume el resto del script; confidence viaja como
+// entero 0-100 y se reescala a [0, 1].
+const DATA = new Array(COLS.brand.length);
+for (let i = 0; i < DATA.length; i++) {
+  DATA[i] = {
+    brand: COLS.brand_pool[COLS.brand[i]],
+    model: COLS.model[i],
+    parameter: COLS.param_pool[COLS.parameter[i]],
+    value: COLS.value[i],
+    unit: COLS.unit_pool[COLS.unit[i]],
+    confidence: COLS.conf[i] / 100,
+    source_url: COLS.source_url[i],
+    _model_lc: COLS.model_lc[i],
+    value_num: COLS.value_num[i],
+  };
+}
 
 // Populate table and filters
 const brands = [...new Set(DATA.map(d => d.brand))].sort();
@@ -139,11 +181,22 @@ const fParam = document.getElementById('fParam');
 brands.forEach(b => { const o = document.createElement('option'); o.value = b; o.textContent = b; fBrand.appendChild(o); });
 params.forEach(p => { const o = document.createElement('option'); o.value = p; o.textContent = p; fParam.appendChild(o); });
 
+// Indices invertidos brand/parameter → posiciones en DATA. applyFilters
+// parte del subconjunto indexado en vez de escanear todo DATA por evento.
+const byBrand = new Map(), byParam = new Map();
+DATA.forEach((d, i) => {
+  if (!byBrand.has(d.brand)) byBrand.set(d.brand, []);
+  byBrand.get(d.brand).push(i);
+  if (!byParam.has(d.parameter)) byParam.set(d.parameter, []);
+  byParam.get(d.parameter).push(i);
+});
+
+// Escape HTML por tabla+regex: sin crear un nodo DOM por llamada
+const ESC_MAP = {'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'};
+const ESC_RE = /[&<>"']/g;
 function esc(s) {
   if (!s) return '';
-  const d = document.createElement('div');
-  d.textContent = String(s);
-  return d.innerHTML;
+  return String(s).replace(ESC_RE, ch => ESC_MAP[ch]);
 }
 
 function confBadge(c) {
@@ -165,17 +218,59 @@ function truncUrl(url) {
   catch { return url.slice(0, 50); }
 }
 
+// Tabla virtualizada: solo la ventana visible de filas existe en el DOM.
+// El costo de render queda acotado por el alto del viewport, no por N.
+const ROW_H = 33;     // alto estimado de fila (px)
+const OVERSCAN = 10;  // filas extra arriba/abajo del viewport
+const wrapper = document.querySelector('.table-wrapper');
+let specBody = document.getElementById('specBody');
+let filteredRows = DATA;
+let rafPending = false;
+
+function rowHtml(d) {
+  const href = safeUrl(d.source_url);
+  const srcCell = href
+    ? `<a href="${esc(href)}" target="_blank" rel="noopener noreferrer">${esc(truncUrl(href))}</a>`
+    : '';
+  return `<tr><td>${esc(d.brand)}</td><td>${esc(d.model)}</td><td>${esc(d.parameter)}</td>` +
+    `<td>${esc(d.value)}</td><td>${esc(d.unit)}</td><td>${confBadge(d.confidence)}</td>` +
+    `<td>${srcCell}</td></tr>`;
+}
+
+// El markup de cada fila es inmutable: se genera una sola vez y las
+// re-renderizaciones (scroll/filtro/sort) solo concatenan strings cacheados.
+DATA.forEach((d, i) => { d._idx = i; });
+const ROW_HTML = DATA.map(rowHtml);
+
+function renderWindow() {
+  const start = Math.max(0, Math.floor(wrapper.scrollTop / ROW_H) - OVERSCAN);
+  const end = Math.min(filteredRows.length,
+    start + Math.ceil(wrapper.clientHeight / ROW_H) + 2 * OVERSCAN);
+  const parts = [];
+  const topPad = start * ROW_H;
+  const bottomPad = (filteredRows.length - end) * ROW_H;
+  if (topPad > 0) parts.push(`<tr style="height:${topPad}px"><td colspan="7"></td></tr>`);
+  for (let i = start; i < end; i++) parts.push(ROW_HTML[filteredRows[i]._idx]);
+  if (bottomPad > 0) parts.push(`<tr style="height:${bottomPad}px"><td colspan="7"></td></tr>`);
+  // Parsear el HTML en un tbody desconectado y recien ahi insertarlo:
+  // un solo reflow por render en vez de mutar el nodo vivo.
+  const fresh = document.createElement('tbody');
+  fresh.id = 'specBody';
+  fresh.innerHTML = parts.join('');
+  specBody.replaceWith(fresh);
+  specBody = fresh;
+}
+
+wrapper.addEventListener('scroll', () => {
+  if (rafPending) return;
+  rafPending = true;
+  requestAnimationFrame(() => { rafPending = false; renderWindow(); });
+});
+
 function renderTable(rows) {
-  const body = document.getElementById('specBody');
-  body.innerHTML = rows.map(d => {
-    const href = safeUrl(d.source_url);
-    const srcCell = href
-      ? `<a href="${esc(href)}" target="_blank" rel="noopener noreferrer">${esc(truncUrl(href))}</a>`
-      : '';
-    return `<tr><td>${esc(d.brand)}</td><td>${esc(d.model)}</td><td>${esc(d.parameter)}</td>` +
-      `<td>${esc(d.value)}</td><td>${esc(d.unit)}</td><td>${confBadge(d.confidence)}</td>` +
-      `<td>${srcCell}</td></tr>`;
-  }).join('');
+  filteredRows = rows;
+  wrapper.scrollTop = 0;
+  renderWindow();
   document.getElementById('rowCount').textContent = `Showing ${rows.length} of ${DATA.length} specs`;
 }
 
@@ -184,238 +279,421 @@ function applyFilters() {
   const param = fParam.value;
   const conf = parseFloat(document.getElementById('fConf').value);
   const model = document.getElementById('fModel').value.toLowerCase();
-  const filtered = DATA.filter(d =>
-    (!brand || d.brand === brand) &&
-    (!param || d.parameter === param) &&
-    (d.confidence >= conf) &&
-    (!model || d.model.toLowerCase().includes(model))
-  );
+  let pool;
+  if (brand && param) {
+    const a = byBrand.get(brand) || [], b = byParam.get(param) || [];
+    pool = (a.length <= b.length ? a : b)
+      .map(i => DATA[i])
+      .filter(d => d.brand === brand && d.parameter === param);
+  } else if (brand) {
+    pool = (byBrand.get(brand) || []).map(i => DATA[i]);
+  } else if (param) {
+    pool = (byParam.get(param) || []).map(i => DATA[i]);
+  } else {
+    pool = DATA;
+  }
+  const filtered = pool.filter(d =>
+    d.confidence >= conf && (!model || d._model_lc.includes(model)));
   renderTable(filtered);
 }
 
-// Sort
+// El filtro de texto re-filtra como mucho una vez por frame: al teclear
+// rapido los eventos input intermedios se coalescen en un solo applyFilters.
+let filterPending = false;
+function scheduleFilters() {
+  if (filterPending) return;
+  filterPending = true;
+  requestAnimationFrame(() => { filterPending = false; applyFilters(); });
+}
+
+// Sort: ordena el array de datos filtrados y re-renderiza la ventana
 let sortCol = -1, sortAsc = true;
+const SORT_KEYS = ['brand','model','parameter','value','unit','confidence','source_url'];
 function sortTable(col) {
   if (sortCol === col) sortAsc = !sortAsc; else { sortCol = col; sortAsc = true; }
-  const keys = ['brand','model','parameter','value','unit','confidence','source_url'];
-  const key = keys[col];
-  const rows = [...document.getElementById('specBody').rows];
-  const body = document.getElementById('specBody');
-  rows.sort((a, b) => {
-    let va = a.cells[col].textContent, vb = b.cells[col].textContent;
+  const key = SORT_KEYS[col];
+  filteredRows = [...filteredRows].sort((a, b) => {
+    let va = a[key], vb = b[key];
+    if (col === 3) { va = a.value_num ?? -Infinity; vb = b.value_num ?? -Infinity; }
     if (col === 5) { va = parseFloat(va); vb = parseFloat(vb); }
     if (va < vb) return sortAsc ? -1 : 1;
     if (va > vb) return sortAsc ? 1 : -1;
     return 0;
   });
-  rows.forEach(r => body.appendChild(r));
+  renderWindow();
 }
 
 renderTable(DATA);
 
 // === Charts ===
-const weightData = DATA.filter(d => d.parameter === 'peso_operativo' && d.value);
-const powerData = DATA.filter(d => d.parameter === 'potencia_motor' && d.value);
-
-// Bar: Operating weight by model
-if (weightData.length) {
-  Plotly.newPlot('chartWeight', [{
+// Construccion diferida: Plotly se carga con defer y los graficos se
+// arman recien cuando la seccion entra al viewport.
+function buildCharts() {
+  const weightData = DATA.filter(d => d.parameter === 'peso_operativo' && d.value_num != null);
+  const powerData = DATA.filter(d => d.parameter === 'potencia_motor' && d.value_num != null);
+
+  // BARS trae series pre-agregadas del lado servidor (top-50 + "Others")
+  // cuando hay demasiados modelos para un grafico de barras legible; si
+  // viene vacio se grafica todo desde DATA como siempre.
+  const weightBar = (BARS.weight && BARS.weight.x) ? BARS.weight : {
     x: weightData.map(d => d.model),
-    y: weightData.map(d => parseFloat(d.value)),
-    type: 'bar', marker: { color: '#3b82f6' },
-    text: weightData.map(d => d.unit), hoverinfo: 'x+y+text'
-  }], { title: 'Operating Weight by Model', xaxis: { tickangle: -45 },
-        yaxis: { title: 'Weight' }, margin: { b: 120 } },
-  { responsive: true });
-} else {
-  document.getElementById('chartWeight').innerHTML = '<p style="color:#888;padding:40px;text-align:center">No weight data available</p>';
-}
-
-// Bar: Engine power by model
-if (powerData.length) {
-  Plotly.newPlot('chartPower', [{
+    y: weightData.map(d => d.value_num),
+    text: weightData.map(d => d.unit)
+  };
+  const powerBar = (BARS.power && BARS.power.x) ? BARS.power : {
     x: powerData.map(d => d.model),
-    y: powerData.map(d => parseFloat(d.value)),
-    type: 'bar', marker: { color: '#f59e0b' },
-    text: powerData.map(d => d.unit), hoverinfo: 'x+y+text'
-  }], { title: 'Engine Power by Model', xaxis: { tickangle: -45 },
-        yaxis: { title: 'Power' }, margin: { b: 120 } },
-  { responsive: true });
-} else {
-  document.getElementById('chartPower').innerHTML = '<p style="color:#888;padding:40px;text-align:center">No power data available</p>';
-}
+    y: powerData.map(d => d.value_num),
+    text: powerData.map(d => d.unit)
+  };
+
+  // Bar: Operating weight by model
+  if (weightBar.x.length) {
+    Plotly.newPlot('chartWeight', [{
+      x: weightBar.x, y: weightBar.y,
+      type: 'bar', marker: { color: '#3b82f6' },
+      text: weightBar.text, hoverinfo: 'x+y+text'
+    }], { title: 'Operating Weight by Model', xaxis: { tickangle: -45 },
+          yaxis: { title: 'Weight' }, margin: { b: 120 } },
+    { responsive: true });
+  } else {
+    document.getElementById('chartWeight').innerHTML = '<p style="color:#888;padding:40px;text-align:center">No weight data available</p>';
+  }
 
-// Scatter: Weight vs Power
-const scatterModels = [...new Set([...weightData.map(d=>d.model), ...powerData.map(d=>d.model)])];
-const scatterPts = scatterModels.map(m => {
-  const w = weightData.find(d => d.model === m);
-  const p = powerData.find(d => d.model === m);
-  if (w && p) return { model: m, weight: parseFloat(w.value), power: parseFloat(p.value) };
-  return null;
-}).filter(Boolean);
-
-if (scatterPts.length) {
-  Plotly.newPlot('chartScatter', [{
-    x: scatterPts.map(d => d.weight),
-    y: scatterPts.map(d => d.power),
-    text: scatterPts.map(d => d.model),
-    mode: 'markers+text', type: 'scatter',
-    textposition: 'top center', textfont: { size: 9 },
-    marker: { size: 12, color: '#10b981' }
-  }], { title: 'Weight vs Power', xaxis: { title: 'Operating Weight' },
-        yaxis: { title: 'Engine Power' }, margin: { t: 40 } },
-  { responsive: true });
-} else {
-  document.getElementById('chartScatter').innerHTML = '<p style="color:#888;padding:40px;text-align:center">Not enough data for scatter</p>';
-}
+  // Bar: Engine power by model
+  if (powerBar.x.length) {
+    Plotly.newPlot('chartPower', [{
+      x: powerBar.x, y: powerBar.y,
+      type: 'bar', marker: { color: '#f59e0b' },
+      text: powerBar.text, hoverinfo: 'x+y+text'
+    }], { title: 'Engine Power by Model', xaxis: { tickangle: -45 },
+          yaxis: { title: 'Power' }, margin: { b: 120 } },
+    { responsive: true });
+  } else {
+    document.getElementById('chartPower').innerHTML = '<p style="color:#888;padding:40px;text-align:center">No power data available</p>';
+  }
 
-// Heatmap: Confidence by parameter and model
-const hModels = [...new Set(DATA.map(d => d.model))].sort();
-const hParams = [...new Set(DATA.map(d => d.parameter))].sort();
-const zData = hParams.map(p => hModels.map(m => {
-  const match = DATA.find(d => d.model === m && d.parameter === p);
-  return match ? match.confidence : null;
-}));
-
-if (hModels.length && hParams.length) {
-  Plotly.newPlot('chartHeatmap', [{
-    z: zData, x: hModels, y: hParams, type: 'heatmap',
-    colorscale: [[0,'#fee2e2'],[0.5,'#fef9c3'],[1,'#dcfce7']],
-    hoverongaps: false
-  }], { title: 'Confidence Heatmap', margin: { l: 140, b: 120 },
-        xaxis: { tickangle: -45 } },
-  { responsive: true });
-} else {
-  document.getElementById('chartHeatmap').innerHTML = '<p style="color:#888;padding:40px;text-align:center">No data for heatmap</p>';
-}
+  // Scatter: Weight vs Power — join en una sola pasada sobre powerData;
+  // solo la interseccion de modelos aporta puntos, asi que no hace falta
+  // materializar la union de claves.
+  const wByModel = new Map(weightData.map(d => [d.model, d.value_num]));
+  const scatterPts = [];
+  for (const p of powerData) {
+    const w = wByModel.get(p.model);
+    if (w !== undefined) scatterPts.push({ model: p.model, weight: w, power: p.value_num });
+  }
+
+  if (scatterPts.length) {
+    Plotly.newPlot('chartScatter', [{
+      x: scatterPts.map(d => d.weight),
+      y: scatterPts.map(d => d.power),
+      text: scatterPts.map(d => d.model),
+      mode: 'markers+text', type: 'scattergl',
+      textposition: 'top center', textfont: { size: 9 },
+      marker: { size: 12, color: '#10b981' }
+    }], { title: 'Weight vs Power', xaxis: { title: 'Operating Weight' },
+          yaxis: { title: 'Engine Power' }, margin: { t: 40 } },
+    { responsive: true });
+  } else {
+    document.getElementById('chartScatter').innerHTML = '<p style="color:#888;padding:40px;text-align:center">Not enough data for scatter</p>';
+  }
 
-// === Rimpull Curves Chart ===
-const GEAR_ORDER = {'1st':1,'2nd':2,'3rd':3,'4th':4,'5th':5,'6th':6,'7th':7,'Direct':8,'Reverse':9};
-if (RIMPULL_DATA.length) {
-  const rModels = [...new Set(RIMPULL_DATA.map(d => d.brand + ' ' + d.model))];
-  const colors = ['#3b82f6','#ef4444','#10b981','#f59e0b','#8b5cf6','#ec4899','#06b6d4','#84cc16'];
-  const rTraces = rModels.map((key, i) => {
-    const pts = RIMPULL_DATA.filter(d => (d.brand + ' ' + d.model) === key)
-      .sort((a,b) => (GEAR_ORDER[a.gear]||99) - (GEAR_ORDER[b.gear]||99));
-    return {
-      x: pts.map(d => d.gear),
-      y: pts.map(d => d.force_kn),
-      name: key,
-      mode: 'lines+markers',
-      type: 'scatter',
-      marker: { size: 8, color: colors[i % colors.length] },
-      line: { color: colors[i % colors.length] },
-      text: pts.map(d => `${key}<br>Gear: ${d.gear}<br>Force: ${d.force_kn} kN` +
-        (d.speed_kmh ? `<br>Speed: ${d.speed_kmh} km/h` : '')),
-      hoverinfo: 'text'
-    };
+  // Heatmap: Confidence by parameter and model
+  const hModels = [...new Set(DATA.map(d => d.model))].sort();
+  const hParams = [...new Set(DATA.map(d => d.parameter))].sort();
+  // Indexar una sola pasada: evita el find() O(N) por cada celda (M x P)
+  const byKey = new Map();
+  DATA.forEach(d => {
+    const k = d.model + '\\x00' + d.parameter;
+    if (!byKey.has(k)) byKey.set(k, d.confidence);
   });
-  Plotly.newPlot('chartRimpull', rTraces, {
-    title: 'Rimpull Curves by Model',
-    xaxis: { title: 'Gear', categoryorder: 'array',
-             categoryarray: Object.keys(GEAR_ORDER) },
-    yaxis: { title: 'Force (kN)' },
-    margin: { b: 80 },
-    legend: { orientation: 'h', y: -0.2 }
-  }, { responsive: true });
-
-  // Force vs Speed chart (if speed data available)
-  const speedPts = RIMPULL_DATA.filter(d => d.speed_kmh != null);
-  if (speedPts.length) {
-    const sModels = [...new Set(speedPts.map(d => d.brand + ' ' + d.model))];
-    const sTraces = sModels.map((key, i) => {
-      const pts = speedPts.filter(d => (d.brand + ' ' + d.model) === key)
-        .sort((a,b) => a.speed_kmh - b.speed_kmh);
+  const zData = hParams.map(p => hModels.map(m => byKey.get(m + '\\x00' + p) ?? null));
+
+  if (hModels.length && hParams.length) {
+    Plotly.newPlot('chartHeatmap', [{
+      z: zData, x: hModels, y: hParams, type: 'heatmap',
+      colorscale: [[0,'#fee2e2'],[0.5,'#fef9c3'],[1,'#dcfce7']],
+      hoverongaps: false
+    }], { title: 'Confidence Heatmap', margin: { l: 140, b: 120 },
+          xaxis: { tickangle: -45 } },
+    { responsive: true });
+  } else {
+    document.getElementById('chartHeatmap').innerHTML = '<p style="color:#888;padding:40px;text-align:center">No data for heatmap</p>';
+  }
+
+  // === Rimpull Curves Chart ===
+  const GEAR_ORDER = {'1st':1,'2nd':2,'3rd':3,'4th':4,'5th':5,'6th':6,'7th':7,'Direct':8,'Reverse':9};
+  if (RIMPULL_DATA.length) {
+    const rModels = [...new Set(RIMPULL_DATA.map(d => d.brand + ' ' + d.model))];
+    const colors = ['#3b82f6','#ef4444','#10b981','#f59e0b','#8b5cf6','#ec4899','#06b6d4','#84cc16'];
+    const rTraces = rModels.map((key, i) => {
+      const pts = RIMPULL_DATA.filter(d => (d.brand + ' ' + d.model) === key)
+        .sort((a,b) => (GEAR_ORDER[a.gear]||99) - (GEAR_ORDER[b.gear]||99));
       return {
-        x: pts.map(d => d.speed_kmh),
+        x: pts.map(d => d.gear),
         y: pts.map(d => d.force_kn),
         name: key,
         mode: 'lines+markers',
-        type: 'scatter',
+        type: 'scattergl',
         marker: { size: 8, color: colors[i % colors.length] },
         line: { color: colors[i % colors.length] },
-        text: pts.map(d => `${key}<br>Gear: ${d.gear}<br>Force: ${d.force_kn} kN<br>Speed: ${d.speed_kmh} km/h`),
+        text: pts.map(d => `${key}<br>Gear: ${d.gear}<br>Force: ${d.force_kn} kN` +
+          (d.speed_kmh ? `<br>Speed: ${d.speed_kmh} km/h` : '')),
         hoverinfo: 'text'
       };
     });
-    Plotly.newPlot('chartRimpullSpeed', sTraces, {
-      title: 'Rimpull: Force vs Speed',
-      xaxis: { title: 'Speed (km/h)' },
+    Plotly.newPlot('chartRimpull', rTraces, {
+      title: 'Rimpull Curves by Model',
+      xaxis: { title: 'Gear', categoryorder: 'array',
+               categoryarray: Object.keys(GEAR_ORDER) },
       yaxis: { title: 'Force (kN)' },
       margin: { b: 80 },
       legend: { orientation: 'h', y: -0.2 }
     }, { responsive: true });
+
+    // Force vs Speed chart (if speed data available)
+    const speedPts = RIMPULL_DATA.filter(d => d.speed_kmh != null);
+    if (speedPts.length) {
+      const sModels = [...new Set(speedPts.map(d => d.brand + ' ' + d.model))];
+      const sTraces = sModels.map((key, i) => {
+        const pts = speedPts.filter(d => (d.brand + ' ' + d.model) === key)
+          .sort((a,b) => a.speed_kmh - b.speed_kmh);
+        return {
+          x: pts.map(d => d.speed_kmh),
+          y: pts.map(d => d.force_kn),
+          name: key,
+          mode: 'lines+markers',
+          type: 'scattergl',
+          marker: { size: 8, color: colors[i % colors.length] },
+          line: { color: colors[i % colors.length] },
+          text: pts.map(d => `${key}<br>Gear: ${d.gear}<br>Force: ${d.force_kn} kN<br>Speed: ${d.speed_kmh} km/h`),
+          hoverinfo: 'text'
+        };
+      });
+      Plotly.newPlot('chartRimpullSpeed', sTraces, {
+        title: 'Rimpull: Force vs Speed',
+        xaxis: { title: 'Speed (km/h)' },
+        yaxis: { title: 'Force (kN)' },
+        margin: { b: 80 },
+        legend: { orientation: 'h', y: -0.2 }
+      }, { responsive: true });
+    } else {
+      document.getElementById('chartRimpullSpeed').innerHTML = '<p style="color:#888;padding:40px;text-align:center">No speed data available for rimpull curves</p>';
+    }
   } else {
-    document.getElementById('chartRimpullSpeed').innerHTML = '<p style="color:#888;padding:40px;text-align:center">No speed data available for rimpull curves</p>';
+    document.getElementById('chartRimpull').innerHTML = '<p style="color:#888;padding:40px;text-align:center">No rimpull curve data available</p>';
+    document.getElementById('chartRimpullSpeed').innerHTML = '';
   }
+}
+
+let chartsBuilt = false;
+function tryBuildCharts() {
+  if (chartsBuilt) return;
+  if (typeof Plotly === 'undefined') {
+    window.addEventListener('load', tryBuildCharts, { once: true });
+    return;
+  }
+  chartsBuilt = true;
+  buildCharts();
+}
+const chartsSection = document.querySelector('.charts');
+if ('IntersectionObserver' in window) {
+  const io = new IntersectionObserver((entries, obs) => {
+    if (entries.some(e => e.isIntersecting)) { obs.disconnect(); tryBuildCharts(); }
+  }, { rootMargin: '200px' });
+  io.observe(chartsSection);
 } else {
-  document.getElementById('chartRimpull').innerHTML = '<p style="color:#888;padding:40px;text-align:center">No rimpull curve data available</p>';
-  document.getElementById('chartRimpullSpeed').innerHTML = '';
+  tryBuildCharts();
 }
 </script>
+<script defer src="https://cdn.plot.ly/plotly-2.27.0.min.js"
+        integrity="sha384-Hl48Kq2HifOWdXEjMsKo6qxqvRLTYqIGbvlENBmkHAxZKIGCXv43H6W1jA671RzC"
+        crossorigin="anonymous"></script>
 </body>
 </html>"""
 
 
+# Template pre-segmentado en import: los indices pares son literales HTML
+# (ya codificados a bytes) y los impares nombres de placeholder. generate()
+# escribe segmento a segmento en vez de copiar el HTML completo con cada
+# str.replace() — el template pesa cientos de KB y el payload JSON mas aun.
+_PLACEHOLDER_RE = re.compile(r"\{\{(\w+)\}\}")
+_TEMPLATE_SEGMENTS = [
+    part.encode("utf-8") if i % 2 == 0 else part
+    for i, part in enumerate(_PLACEHOLDER_RE.split(HTML_TEMPLATE))
+]
+
+# Secuencias que pueden romper el contexto <script>: '</' y '<!--'
+_SCRIPT_BREAKERS = re.compile(r"</|<!--")
+
+
 def _safe_json_for_html(data, **kwargs) -> str:
     """Serialize data to JSON safe for embedding in HTML <script> tags.
 
-    Escapes sequences that could break out of a script context:
+    Usa orjson (C, ~5-10x mas rapido que json para payloads grandes) si esta
+    instalado, con fallback al json stdlib. Escapa en una sola pasada las
+    secuencias que podrian salir del contexto script:
     - '</' → '<\\/' (prevents </script> injection)
     - '<!--' → '<\\!--' (prevents HTML comment injection)
     """
-    raw = json.dumps(data, ensure_ascii=False, default=str, **kwargs)
-    raw = raw.replace("</", r"<\/")
-    raw = raw.replace("<!--", r"<\!--")
-    return raw
+    if orjson is not None and not kwargs:
+        raw = orjson.dumps(data, default=str).decode("utf-8")
+    else:
+        raw = json.dumps(data, ensure_ascii=False, default=str, **kwargs)
+    return _SCRIPT_BREAKERS.sub(lambda m: "<\\" + m.group(0)[1:], raw)
 
 
 class HTMLReportGenerator:
     """Genera un reporte HTML interactivo standalone con tabla filtrable y graficos Plotly."""
 
-    def __init__(self, db: DatabaseManager, output_dir: str = "data/reports"):
+    def __init__(
+        self,
+        db: DatabaseManager,
+        output_dir: str = "data/reports",
+        min_confidence: float = 0.0,
+        require_value: bool = False,
+    ):
         self.db = db
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Filtros de payload: filas bajo min_confidence (o sin valor, si
+        # require_value) no se embeben en el HTML — menos KB y menos filas
+        # que el browser tiene que indexar.
+        self.min_confidence = min_confidence
+        self.require_value = require_value
 
     def generate(self) -> str:
-        """Genera el reporte HTML y retorna la ruta del archivo."""
+        """Genera el reporte HTML y retorna la ruta del archivo.
+
+        Si el contenido de la DB no cambio desde la ultima corrida (huella en
+        .cache_hash), reutiliza el reporte existente sin regenerarlo."""
+        output_path = self.output_dir / "equipment_report.html"
+        cache_path = self.output_dir / ".cache_hash"
+        # La huella incluye los filtros de payload: cambiar min_confidence o
+        # require_value debe invalidar el reporte cacheado.
+        fingerprint = hashlib.blake2b(
+            repr((self.db.get_content_fingerprint(),
+                  self.min_confidence, self.require_value)).encode(),
+            digest_size=16,
+        ).hexdigest()
+        if output_path.exists() and cache_path.exists():
+            if cache_path.read_text(encoding="utf-8") == fingerprint:
+                logger.info(f"Reporte HTML sin cambios, reutilizado: {output_path}")
+                return str(output_path)
+
         df = self.db.get_all_specs_dataframe()
 
         if df.empty:
             logger.warning("No hay datos para generar reporte HTML")
             return ""
 
-        # Prepare data as list of dicts for JSON embedding
-        records = df.to_dict(orient="records")
-        # Ensure confidence is float
-        for r in records:
-            r["confidence"] = float(r.get("confidence", 0) or 0)
-
-        # Compute summary stats
-        total_brands = df["brand"].nunique()
-        total_models = df["model"].nunique()
-        total_specs = len(df)
-        avg_confidence = df["confidence"].mean()
-
-        # Build HTML from template
-        html = HTML_TEMPLATE
-        html = html.replace("{{generated_at}}", datetime.now().strftime("%Y-%m-%d %H:%M"))
-        html = html.replace("{{total_brands}}", str(total_brands))
-        html = html.replace("{{total_models}}", str(total_models))
-        html = html.replace("{{total_specs}}", str(total_specs))
-        html = html.replace("{{avg_confidence}}", f"{avg_confidence:.2f}")
-        html = html.replace("{{data_json}}", _safe_json_for_html(records))
-
-        # Rimpull curve data
+        # Campos precomputados del lado servidor: el JS los consume directo
+        # en filtros/sort/charts sin repetir toLowerCase()/parseFloat() por fila.
+        df["_model_lc"] = df["model"].fillna("").str.lower()
+        value_num = pd.to_numeric(df["value"], errors="coerce")
+        df["value_num"] = value_num.astype(object).where(value_num.notna(), None)
+        # Coercion vectorizada de confidence a float (None/str sucios → 0.0)
+        df["confidence"] = pd.to_numeric(df["confidence"], errors="coerce").fillna(0.0)
+
+        if self.min_confidence > 0:
+            df = df[df["confidence"] >= self.min_confidence]
+        if self.require_value:
+            df = df[df["value"].fillna("").astype(str).str.strip() != ""]
+
+        # Payload columnar (SoA): una lista por columna en vez de N objetos
+        # repitiendo las mismas claves. Solo viajan las columnas que el JS
+        # consume, y confidence va como entero 0-100 (2 decimales implicitos),
+        # lo que recorta varios bytes por fila frente a floats 0.xx.
+        # brand/parameter/unit tienen baja cardinalidad: se codifican como
+        # indices en un pool de strings unicos en vez de repetir cada string.
+        brand_codes, brand_pool = pd.factorize(df["brand"], use_na_sentinel=False)
+        param_codes, param_pool = pd.factorize(df["parameter"], use_na_sentinel=False)
+        unit_codes, unit_pool = pd.factorize(df["unit"], use_na_sentinel=False)
+        payload = {
+            "brand_pool": brand_pool.tolist(),
+            "param_pool": param_pool.tolist(),
+            "unit_pool": unit_pool.tolist(),
+            "brand": brand_codes.tolist(),
+            "model": df["model"].tolist(),
+            "parameter": param_codes.tolist(),
+            "value": df["value"].tolist(),
+            "unit": unit_codes.tolist(),
+            "conf": (df["confidence"] * 100).round().astype(int).tolist(),
+            "source_url": df["source_url"].tolist(),
+            "model_lc": df["_model_lc"].tolist(),
+            "value_num": df["value_num"].tolist(),
+        }
+
+        # Las tarjetas de resumen salen de agregados SQL (COUNT DISTINCT / AVG),
+        # no de recorrer el DataFrame completo en pandas.
+        stats = self.db.get_summary_stats()
+
+        def _bar_payload(param: str) -> dict:
+            """Serie pre-agregada para los graficos de barras.
+
+            Con mas de 50 modelos, el grafico de barras completo es ilegible y
+            pesado: se embeben solo los 50 valores mas altos mas una barra
+            'Others (n=K)' con el promedio del resto. Con <= 50 filas retorna
+            vacio y el cliente grafica todo desde DATA."""
+            rows = df[df["parameter"] == param].copy()
+            rows["_v"] = pd.to_numeric(rows["value"], errors="coerce")
+            rows = rows.dropna(subset=["_v"])
+            if len(rows) <= 50:
+                return {}
+            rows = rows.sort_values("_v", ascending=False)
+            top, rest = rows.head(50), rows.iloc[50:]
+            return {
+                "x": top["model"].tolist() + [f"Others (n={len(rest)})"],
+                "y": top["_v"].tolist() + [float(rest["_v"].mean())],
+                "text": top["unit"].tolist() + ["avg"],
+            }
+
+        bars_payload = {
+            "weight": _bar_payload("peso_operativo"),
+            "power": _bar_payload("potencia_motor"),
+        }
+
+        # Rimpull curve data — mismo formato columnar que las specs; tomar
+        # las listas directo de las columnas evita construir N dicts fila.
         try:
             rimpull_df = self.db.get_rimpull_curves_dataframe()
-            rimpull_records = rimpull_df.to_dict(orient="records") if not rimpull_df.empty else []
         except Exception:
-            rimpull_records = []
-        html = html.replace("{{rimpull_json}}", _safe_json_for_html(rimpull_records))
-
-        output_path = self.output_dir / "equipment_report.html"
-        output_path.write_text(html, encoding="utf-8")
+            rimpull_df = None
+        if rimpull_df is not None and not rimpull_df.empty:
+            # Puntos sin fuerza no aportan nada a las curvas
+            rimpull_df = rimpull_df.dropna(subset=["force_kn"])
+        if rimpull_df is not None and not rimpull_df.empty:
+            rimpull_payload = {
+                c: rimpull_df[c].tolist()
+                for c in ("brand", "model", "gear", "speed_kmh", "force_kn")
+            }
+        else:
+            rimpull_payload = {}
+
+        values = {
+            "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "total_brands": str(stats["total_brands"]),
+            "total_models": str(stats["total_models"]),
+            "total_specs": str(stats["total_specs"]),
+            "avg_confidence": f"{stats['avg_confidence']:.2f}",
+            "data_json": _safe_json_for_html(payload),
+            "rimpull_json": _safe_json_for_html(rimpull_payload),
+            "bars_json": _safe_json_for_html(bars_payload),
+        }
+
+        # Escritura atomica: nunca dejar un reporte a medias si el proceso muere.
+        # En paralelo se escribe un sidecar .html.gz listo para servir
+        # precomprimido (Content-Encoding: gzip) o compartir por mail.
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
+        gz_path = output_path.with_name(output_path.name + ".gz")
+        tmp_gz_path = gz_path.with_name(gz_path.name + ".tmp")
+        with open(tmp_path, "wb") as fh, \
+                gzip.open(tmp_gz_path, "wb", compresslevel=6) as gz:
+            for seg in _TEMPLATE_SEGMENTS:
+                data = seg if isinstance(seg, bytes) else values[seg].encode("utf-8")
+                fh.write(data)
+                gz.write(data)
+        os.replace(tmp_path, output_path)
+        os.replace(tmp_gz_path, gz_path)
+        cache_path.write_text(fingerprint, encoding="utf-8")
         logger.info(f"Reporte HTML generado: {output_path}")
         return str(output_path)
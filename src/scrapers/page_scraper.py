@@ -3,14 +3,16 @@ Modulo de scraping de paginas web para extraer contenido tecnico de equipos mine
 Soporta HTML estatico y paginas con JavaScript (via Playwright).
 """
 
+import asyncio
+import io
 import logging
-import os
 import re
 import time
 from dataclasses import dataclass
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse, urljoin, urlsplit, SplitResult
 
 import httpx
+import pdfplumber
 from bs4 import BeautifulSoup
 
 from urllib.robotparser import RobotFileParser
@@ -20,6 +22,44 @@ from src.utils.url_validator import is_safe_url
 logger = logging.getLogger(__name__)
 
 
+# Parser de BeautifulSoup: lxml (libxml2, C) es 5-10x mas rapido que el
+# html.parser puro-Python; si no esta instalado se degrada sin romper.
+try:
+    from lxml import etree
+    _BS_PARSER = "lxml"
+except ImportError:
+    etree = None
+    _BS_PARSER = "html.parser"
+
+# selectolax/Lexbor (opcional): parser HTML5 en C con selectores CSS,
+# 10-20x mas rapido que recorrer el arbol con BeautifulSoup. Si no esta
+# instalado, el scraper estatico sigue por el camino BeautifulSoup.
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+
+# Constantes del hot-path de extraccion, compiladas/armadas una sola vez
+_MULTI_NL = re.compile(r"\n{3,}")
+_PDF_SUFFIXES = (".pdf",)
+_STRIP_TAGS = ["script", "style", "nav", "footer", "header"]
+
+
+def _resolve_href(base: SplitResult, base_url: str, href: str) -> str:
+    """Resuelve un href contra la base con fast-paths para los casos comunes.
+
+    Absolutas, protocol-relative y root-relative se arman por concatenacion;
+    solo las relativas con puntos (./ ../ nombre.pdf) pagan urljoin completo."""
+    if href.startswith(("http://", "https://")):
+        return href
+    if href.startswith("//"):
+        return f"{base.scheme}:{href}"
+    if href.startswith("/"):
+        return f"{base.scheme}://{base.netloc}{href}"
+    return urljoin(base_url, href)
+
+
 # Limites de seguridad
 MAX_HTML_BYTES = 10 * 1024 * 1024   # 10 MB para paginas HTML
 MAX_PDF_BYTES = 50 * 1024 * 1024    # 50 MB para PDFs
@@ -27,14 +67,37 @@ PDF_CONTENT_TYPES = {"application/pdf", "application/x-pdf"}
 
 
 _ROBOTS_TTL_SECONDS = 3600  # 1 hour
+# Los dominios sin robots.txt (404 o error) se recuerdan mas tiempo: el
+# archivo ausente rara vez aparece de un momento a otro y cada re-fetch
+# cuesta un request completo por ciclo de TTL.
+_ROBOTS_NEGATIVE_TTL_SECONDS = 24 * 3600
 
 
 class RobotsChecker:
     """Cache de robots.txt por dominio con verificacion de permisos y TTL."""
 
-    def __init__(self, user_agent: str = "MiningEquipResearch/1.0"):
+    def __init__(
+        self,
+        user_agent: str = "MiningEquipResearch/1.0",
+        client: httpx.Client | None = None,
+    ):
         self.user_agent = user_agent
         self._cache: dict[str, tuple[RobotFileParser | None, float]] = {}
+        # Cliente compartido (inyectado por el scraper): reusa la sesion
+        # TCP/TLS del pool cuando el mismo host se scrapea a continuacion.
+        self._client = client
+
+    def _fetch_robots(self, robots_url: str) -> str | None:
+        """Descarga robots.txt; None si el dominio no lo publica (4xx/5xx)."""
+        if self._client is not None:
+            resp = self._client.get(robots_url, timeout=10)
+            if resp.status_code >= 400:
+                return None
+            return resp.text[: 64 * 1024]
+
+        import urllib.request
+        with urllib.request.urlopen(robots_url, timeout=10) as resp:
+            return resp.read(64 * 1024).decode("utf-8", errors="replace")
 
     def is_allowed(self, url: str) -> bool:
         """Verifica si el user-agent tiene permiso para acceder a la URL."""
@@ -46,24 +109,25 @@ class RobotsChecker:
             cached = self._cache.get(base)
             if cached is not None:
                 rp, ts = cached
-                if now - ts > _ROBOTS_TTL_SECONDS:
+                ttl = _ROBOTS_TTL_SECONDS if rp is not None else _ROBOTS_NEGATIVE_TTL_SECONDS
+                if now - ts > ttl:
                     # TTL expired, re-fetch
                     del self._cache[base]
                     cached = None
 
             if cached is None:
-                rp = RobotFileParser()
                 robots_url = f"{base}/robots.txt"
-                rp.set_url(robots_url)
                 try:
-                    import urllib.request
-                    with urllib.request.urlopen(robots_url, timeout=10) as resp:
-                        raw = resp.read(64 * 1024).decode("utf-8", errors="replace")
-                    rp.parse(raw.splitlines())
+                    raw = self._fetch_robots(robots_url)
                 except Exception:
+                    raw = None
+                if raw is None:
                     # Si no se puede leer robots.txt, permitir acceso
                     self._cache[base] = (None, now)
                     return True
+                rp = RobotFileParser()
+                rp.set_url(robots_url)
+                rp.parse(raw.splitlines())
                 self._cache[base] = (rp, now)
             else:
                 rp = cached[0]
@@ -75,7 +139,7 @@ class RobotsChecker:
             return True
 
 
-@dataclass
+@dataclass(slots=True)
 class ScrapedPage:
     """Pagina scrapeada con contenido extraido."""
     url: str
@@ -103,67 +167,249 @@ class StaticPageScraper:
 
     def __init__(self, timeout: int = 30, respect_robots: bool = True):
         self.timeout = timeout
-        self._robots = RobotsChecker() if respect_robots else None
+        # Cliente persistente: el pool keep-alive reusa la sesion TCP/TLS
+        # entre paginas del mismo host (tipico al recorrer el sitio de un
+        # fabricante) en vez de pagar el handshake en cada scrape.
+        self._client = httpx.Client(
+            timeout=httpx.Timeout(self.timeout, connect=10),
+            follow_redirects=True,
+            max_redirects=5,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        )
+        # robots.txt se descarga por el mismo pool que las paginas
+        self._robots = RobotsChecker(client=self._client) if respect_robots else None
+
+    def close(self):
+        """Cierra el cliente HTTP persistente."""
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def scrape(self, url: str) -> ScrapedPage | None:
         """Scrapea una pagina web y extrae contenido relevante."""
         if not is_safe_url(url):
-            logger.warning(f"URL rechazada por validacion SSRF: {url}")
+            logger.warning("URL rechazada por validacion SSRF: %s", url)
             return None
 
         if self._robots and not self._robots.is_allowed(url):
-            logger.info(f"URL bloqueada por robots.txt: {url}")
+            logger.info("URL bloqueada por robots.txt: %s", url)
             return None
 
         try:
-            with httpx.Client(
-                timeout=httpx.Timeout(self.timeout, connect=10),
-                follow_redirects=True,
-                max_redirects=5,
-            ) as client:
-                response = client.get(url, headers=self.HEADERS)
-                response.raise_for_status()
+            response = self._client.get(url, headers=self.HEADERS)
+            response.raise_for_status()
 
-                if len(response.content) > MAX_HTML_BYTES:
-                    logger.warning(f"Respuesta demasiado grande ({len(response.content)} bytes): {url}")
-                    return None
+            if len(response.content) > MAX_HTML_BYTES:
+                logger.warning("Respuesta demasiado grande (%d bytes): %s", len(response.content), url)
+                return None
 
-                soup = BeautifulSoup(response.text, "html.parser")
-
-                # Remover scripts y estilos
-                for tag in soup(["script", "style", "nav", "footer", "header"]):
-                    tag.decompose()
-
-                title = soup.title.string.strip() if soup.title and soup.title.string else ""
-                text = self._extract_text(soup)
-                tables = self._extract_tables(soup)
-                pdf_links = self._extract_pdf_links(soup, url)
-                images = self._extract_images(soup, url)
-
-                page = ScrapedPage(
-                    url=url,
-                    title=title,
-                    text_content=text,
-                    tables=tables,
-                    pdf_links=pdf_links,
-                    images=images,
-                    content_length=len(text),
-                )
-                logger.info(f"Scrapeado: {url} ({len(text)} chars, {len(tables)} tablas)")
-                return page
+            page = self._parse_response(
+                response.content, url, encoding=response.charset_encoding
+            )
+            logger.info(
+                "Scrapeado: %s (%d chars, %d tablas)",
+                url, page.content_length, len(page.tables),
+            )
+            return page
 
         except httpx.TimeoutException:
-            logger.error(f"Timeout scrapeando {url} (>{self.timeout}s)")
+            logger.error("Timeout scrapeando %s (>%ds)", url, self.timeout)
             return None
         except Exception as e:
-            logger.error(f"Error scrapeando {url}: {e}")
+            logger.error("Error scrapeando %s: %s", url, e)
             return None
 
+    def _parse_response(self, content: bytes, url: str, encoding: str | None = None) -> ScrapedPage:
+        """Parsea el HTML descargado (fast-path Lexbor o BeautifulSoup)."""
+        if LexborHTMLParser is not None:
+            return self._scrape_with_lexbor(content, url)
+
+        # Si el header Content-Type declara charset, decodificar con el
+        # directamente: BS4 se salta por completo su deteccion de encoding
+        # (chardet y reintentos), que es lo mas caro del bootstrap. Sin
+        # charset declarado, los bytes crudos dejan que lxml detecte en C.
+        markup: bytes | str = content
+        if encoding:
+            try:
+                markup = content.decode(encoding, errors="replace")
+            except LookupError:
+                pass
+        soup = BeautifulSoup(markup, _BS_PARSER)
+
+        # Remover scripts y estilos
+        for tag in soup(_STRIP_TAGS):
+            tag.decompose()
+
+        title = soup.title.string.strip() if soup.title and soup.title.string else ""
+        text = self._extract_text(soup)
+        # Tablas por lxml.etree cuando esta disponible: un solo recorrido en
+        # C del arbol en vez de get_text() por celda via BeautifulSoup
+        if etree is not None:
+            tables = self._extract_tables_lxml(markup)
+        else:
+            tables = self._extract_tables(soup)
+        return ScrapedPage(
+            url=url,
+            title=title,
+            text_content=text,
+            tables=tables,
+            pdf_links=self._extract_pdf_links(soup, url),
+            images=self._extract_images(soup, url),
+            content_length=len(text),
+        )
+
+    @staticmethod
+    def _extract_tables_lxml(content: bytes | str) -> list[list[list[str]]]:
+        """Extraccion de tablas via lxml.etree (itertext en C).
+
+        Mismas reglas que el camino BeautifulSoup: >= 2 filas por tabla y
+        expansion de colspan con celdas vacias."""
+        root = etree.HTML(content)
+        if root is None:
+            return []
+        tables = []
+        for table_tag in root.iter("table"):
+            table_data = []
+            for row in table_tag.iter("tr"):
+                cells = []
+                for cell in row.iterchildren("td", "th"):
+                    cells.append("".join(cell.itertext()).strip())
+                    try:
+                        colspan = int(cell.get("colspan", "1"))
+                    except ValueError:
+                        colspan = 1
+                    cells.extend([""] * (colspan - 1))
+                if cells:
+                    table_data.append(cells)
+            if len(table_data) >= 2:
+                tables.append(table_data)
+        return tables
+
+    async def scrape_many(
+        self,
+        urls: list[str],
+        concurrency: int = 20,
+    ) -> list[ScrapedPage | None]:
+        """Scrapea un lote de URLs concurrentemente.
+
+        El fetch es I/O-bound: un AsyncClient compartido (pool keep-alive)
+        solapa las descargas hasta `concurrency` a la vez, y el parseo
+        CPU-bound se deriva a threads para no bloquear el event loop. Los
+        errores por URL se devuelven como None, igual que en scrape()."""
+        sem = asyncio.Semaphore(concurrency)
+
+        async with httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout, connect=10),
+            follow_redirects=True,
+            max_redirects=5,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        ) as client:
+
+            async def _scrape_one(url: str) -> ScrapedPage | None:
+                if not is_safe_url(url):
+                    logger.warning("URL rechazada por validacion SSRF: %s", url)
+                    return None
+                if self._robots is not None:
+                    allowed = await asyncio.to_thread(self._robots.is_allowed, url)
+                    if not allowed:
+                        logger.info("URL bloqueada por robots.txt: %s", url)
+                        return None
+                try:
+                    async with sem:
+                        response = await client.get(url, headers=self.HEADERS)
+                    response.raise_for_status()
+                except httpx.TimeoutException:
+                    logger.error("Timeout scrapeando %s (>%ds)", url, self.timeout)
+                    return None
+                except Exception as e:
+                    logger.error("Error scrapeando %s: %s", url, e)
+                    return None
+
+                if len(response.content) > MAX_HTML_BYTES:
+                    logger.warning(
+                        "Respuesta demasiado grande (%d bytes): %s",
+                        len(response.content), url,
+                    )
+                    return None
+                return await asyncio.to_thread(
+                    self._parse_response, response.content, url,
+                    response.charset_encoding,
+                )
+
+            results = await asyncio.gather(
+                *(_scrape_one(u) for u in urls), return_exceptions=True
+            )
+
+        return [None if isinstance(r, BaseException) else r for r in results]
+
+    def _scrape_with_lexbor(self, content: bytes, url: str) -> ScrapedPage:
+        """Extraccion completa via selectolax/Lexbor (todo en C).
+
+        Equivalente al camino BeautifulSoup: mismo stripping de tags de
+        navegacion, mismas reglas de tablas (>= 2 filas, expansion de
+        colspan) y misma validacion SSRF de links."""
+        tree = LexborHTMLParser(content)
+        tree.strip_tags(_STRIP_TAGS)
+
+        title_node = tree.css_first("title")
+        title = title_node.text(strip=True) if title_node else ""
+
+        body = tree.body
+        text = body.text(separator="\n", strip=True) if body else ""
+        text = _MULTI_NL.sub("\n\n", text)
+
+        tables = []
+        for table in tree.css("table"):
+            table_data = []
+            for row in table.css("tr"):
+                cells = []
+                for cell in row.css("td,th"):
+                    cells.append(cell.text(strip=True))
+                    try:
+                        colspan = int(cell.attributes.get("colspan") or 1)
+                    except ValueError:
+                        colspan = 1
+                    cells.extend([""] * (colspan - 1))
+                if cells:
+                    table_data.append(cells)
+            if len(table_data) >= 2:
+                tables.append(table_data)
+
+        base_split = urlsplit(url)
+        pdf_links = []
+        for a in tree.css("a[href]"):
+            href = a.attributes.get("href") or ""
+            if href.lower().endswith(_PDF_SUFFIXES):
+                full_url = _resolve_href(base_split, url, href)
+                if is_safe_url(full_url, resolve_dns=False):
+                    pdf_links.append(full_url)
+
+        images = []
+        for img in tree.css("img[src]"):
+            src = img.attributes.get("src") or ""
+            full_url = _resolve_href(base_split, url, src)
+            if is_safe_url(full_url, resolve_dns=False):
+                images.append(full_url)
+
+        return ScrapedPage(
+            url=url,
+            title=title,
+            text_content=text,
+            tables=tables,
+            pdf_links=pdf_links,
+            images=images,
+            content_length=len(text),
+        )
+
     def _extract_text(self, soup: BeautifulSoup) -> str:
         """Extrae texto limpio del HTML."""
         text = soup.get_text(separator="\n", strip=True)
         # Limpiar lineas vacias multiples
-        text = re.sub(r"\n{3,}", "\n\n", text)
+        text = _MULTI_NL.sub("\n\n", text)
         return text
 
     def _extract_tables(self, soup: BeautifulSoup) -> list[list[list[str]]]:
@@ -198,53 +444,113 @@ class StaticPageScraper:
 
     def _extract_pdf_links(self, soup: BeautifulSoup, base_url: str) -> list[str]:
         """Extrae links a PDFs (brochures, datasheets, manuales)."""
+        base_split = urlsplit(base_url)
         pdf_links = []
         for a_tag in soup.find_all("a", href=True):
             href = a_tag["href"]
-            if href.lower().endswith(".pdf"):
-                full_url = urljoin(base_url, href)
+            if href.lower().endswith(_PDF_SUFFIXES):
+                full_url = _resolve_href(base_split, base_url, href)
                 if is_safe_url(full_url, resolve_dns=False):
                     pdf_links.append(full_url)
         return pdf_links
 
     def _extract_images(self, soup: BeautifulSoup, base_url: str) -> list[str]:
         """Extrae URLs de imagenes relevantes."""
+        base_split = urlsplit(base_url)
         images = []
         for img in soup.find_all("img", src=True):
             src = img["src"]
-            full_url = urljoin(base_url, src)
+            full_url = _resolve_href(base_split, base_url, src)
             if is_safe_url(full_url, resolve_dns=False):
                 images.append(full_url)
         return images
 
 
+# Tipos de recurso que no aportan al texto extraido: abortarlos ahorra
+# el grueso del ancho de banda y acelera el networkidle.
+_ABORTED_RESOURCE_TYPES = {"image", "font", "media"}
+
+# playwright es opcional y pesado: se importa recien al primer uso y se
+# cachea aca para que scrapers posteriores no repitan el import.
+_async_playwright = None
+
+
+def _get_async_playwright():
+    global _async_playwright
+    if _async_playwright is None:
+        from playwright.async_api import async_playwright
+        _async_playwright = async_playwright
+    return _async_playwright
+
+
 class DynamicPageScraper:
     """Scraper para paginas con JavaScript usando Playwright."""
 
+    def __init__(self):
+        self._playwright = None
+        self._browser = None
+
+    async def start(self):
+        """Lanza el browser persistente (lazy; scrape() lo llama si hace falta)."""
+        if self._browser is not None:
+            return
+        self._playwright = await _get_async_playwright()().start()
+        self._browser = await self._playwright.chromium.launch(
+            headless=True,
+            args=["--disable-dev-shm-usage", "--no-sandbox"],
+        )
+
+    async def close(self):
+        """Cierra el browser y el runtime de Playwright."""
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @staticmethod
+    async def _abort_heavy_resources(route):
+        if route.request.resource_type in _ABORTED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
     async def scrape(self, url: str) -> ScrapedPage | None:
         """Scrapea pagina renderizada con JavaScript."""
         if not is_safe_url(url):
-            logger.warning(f"URL rechazada por validacion SSRF: {url}")
+            logger.warning("URL rechazada por validacion SSRF: %s", url)
             return None
 
         try:
-            from playwright.async_api import async_playwright
-
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                try:
-                    page = await browser.new_page()
-                    await page.goto(url, wait_until="networkidle", timeout=30000)
-                    content = await page.content()
-                finally:
-                    await browser.close()
-
-            if len(content.encode("utf-8", errors="replace")) > MAX_HTML_BYTES:
-                logger.warning(f"Dynamic content too large ({len(content)} chars): {url}")
+            # El browser se lanza una sola vez y se reusa entre scrapes; el
+            # aislamiento entre paginas lo da el context por-scrape (barato).
+            await self.start()
+            ctx = await self._browser.new_context()
+            try:
+                await ctx.route("**/*", self._abort_heavy_resources)
+                page = await ctx.new_page()
+                await page.goto(url, wait_until="networkidle", timeout=30000)
+                content = await page.content()
+            finally:
+                await ctx.close()
+
+            # Codificar una sola vez para el chequeo de tamano; el parser
+            # recibe el str ya decodificado de Playwright, asi que BS4 no
+            # corre deteccion de charset.
+            raw = content.encode("utf-8", errors="replace")
+            if len(raw) > MAX_HTML_BYTES:
+                logger.warning("Dynamic content too large (%d bytes): %s", len(raw), url)
                 return None
 
-            soup = BeautifulSoup(content, "html.parser")
-            for tag in soup(["script", "style", "nav", "footer"]):
+            soup = BeautifulSoup(content, _BS_PARSER)
+            for tag in soup(_STRIP_TAGS):
                 tag.decompose()
 
             title = soup.title.string.strip() if soup.title and soup.title.string else ""
@@ -260,100 +566,162 @@ class DynamicPageScraper:
                 content_length=len(soup.get_text()),
             )
         except Exception as e:
-            logger.error(f"Error en scraping dinamico {url}: {e}")
+            logger.error("Error en scraping dinamico %s: %s", url, e)
             return None
 
 
 class PDFScraper:
     """Extrae texto y tablas de documentos PDF (brochures, datasheets)."""
 
+    def __init__(self):
+        # Mismo patron de cliente persistente que StaticPageScraper: los
+        # datasheets suelen venir del mismo dominio que la pagina de origen.
+        self._client = httpx.Client(
+            timeout=httpx.Timeout(60, connect=10),
+            follow_redirects=True,
+            max_redirects=5,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        )
+
+    def close(self):
+        """Cierra el cliente HTTP persistente."""
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     def extract_from_url(self, url: str) -> ScrapedPage | None:
         """Descarga y extrae contenido de un PDF con validaciones de seguridad."""
         if not is_safe_url(url):
-            logger.warning(f"URL de PDF rechazada por validacion SSRF: {url}")
+            logger.warning("URL de PDF rechazada por validacion SSRF: %s", url)
             return None
 
-        tmp_path = None
         try:
-            import tempfile
-
-            with httpx.Client(
-                timeout=httpx.Timeout(60, connect=10),
-                follow_redirects=True,
-                max_redirects=5,
-            ) as client:
-                # Streaming download con limite de tamano
-                with client.stream("GET", url) as response:
-                    response.raise_for_status()
+            # Streaming download con limite de tamano
+            with self._client.stream("GET", url) as response:
+                response.raise_for_status()
+
+                # Validar content-type: require valid CT OR .pdf extension
+                ct = response.headers.get("content-type", "").lower().split(";")[0].strip()
+                is_pdf_ct = ct in PDF_CONTENT_TYPES
+                is_pdf_ext = url.lower().endswith(_PDF_SUFFIXES)
+                if not is_pdf_ct and not is_pdf_ext:
+                    logger.warning("Content-type no es PDF (%s) y URL no termina en .pdf: %s", ct, url)
+                    return None
 
-                    # Validar content-type: require valid CT OR .pdf extension
-                    ct = response.headers.get("content-type", "").lower().split(";")[0].strip()
-                    is_pdf_ct = ct in PDF_CONTENT_TYPES
-                    is_pdf_ext = url.lower().endswith(".pdf")
-                    if not is_pdf_ct and not is_pdf_ext:
-                        logger.warning(f"Content-type no es PDF ({ct}) y URL no termina en .pdf: {url}")
+                # Buffer en memoria: el limite de MAX_PDF_BYTES acota el uso
+                # y evita el roundtrip por disco del archivo temporal
+                buf = io.BytesIO()
+                total = 0
+                for chunk in response.iter_bytes(chunk_size=8192):
+                    total += len(chunk)
+                    if total > MAX_PDF_BYTES:
+                        logger.warning("PDF excede limite de %d bytes: %s", MAX_PDF_BYTES, url)
                         return None
+                    buf.write(chunk)
 
-                    # Stream directly to temp file to avoid memory accumulation
-                    total = 0
-                    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
-                        tmp_path = f.name
-                        for chunk in response.iter_bytes(chunk_size=8192):
-                            total += len(chunk)
-                            if total > MAX_PDF_BYTES:
-                                logger.warning(f"PDF excede limite de {MAX_PDF_BYTES} bytes: {url}")
-                                return None
-                            f.write(chunk)
+            buf.seek(0)
+            with pdfplumber.open(buf) as pdf:
+                all_text, all_tables = self._extract_pages(pdf.pages)
 
-            return self.extract_from_file(tmp_path, source_url=url)
+            return self._build_page(all_text, all_tables, url, url)
 
         except Exception as e:
-            logger.error(f"Error extrayendo PDF {url}: {e}")
+            logger.error("Error extrayendo PDF %s: %s", url, e)
             return None
-        finally:
-            # Limpiar archivo temporal
-            if tmp_path:
-                try:
-                    os.unlink(tmp_path)
-                except OSError:
-                    pass
+
+    @staticmethod
+    def _extract_pages(pages) -> tuple[list[str], list[list[list[str]]]]:
+        """Extrae texto y tablas limpias de una secuencia de paginas pdfplumber."""
+        all_text = []
+        all_tables = []
+        for page in pages:
+            text = page.extract_text()
+            if text:
+                all_text.append(text)
+
+            tables = page.extract_tables()
+            for table in tables:
+                clean_table = [
+                    [cell or "" for cell in row]
+                    for row in table
+                    if row
+                ]
+                if clean_table:
+                    all_tables.append(clean_table)
+        return all_text, all_tables
+
+    @staticmethod
+    def _build_page(all_text, all_tables, source_url: str, filepath: str) -> ScrapedPage:
+        full_text = "\n\n".join(all_text)
+        return ScrapedPage(
+            url=source_url,
+            title=f"PDF: {source_url.split('/')[-1] if source_url else filepath}",
+            text_content=full_text,
+            tables=all_tables,
+            pdf_links=[],
+            images=[],
+            content_length=len(full_text),
+        )
+
+    # Por debajo de este numero de paginas el costo de levantar procesos
+    # supera lo que se gana paralelizando; se procesa secuencial.
+    _PARALLEL_MIN_PAGES = 8
 
     def extract_from_file(self, filepath: str, source_url: str = "") -> ScrapedPage | None:
-        """Extrae contenido de un archivo PDF local."""
+        """Extrae contenido de un archivo PDF local (datasheets descargados a disco)."""
         try:
-            import pdfplumber
+            with pdfplumber.open(filepath) as pdf:
+                n_pages = len(pdf.pages)
+                if n_pages < self._PARALLEL_MIN_PAGES:
+                    all_text, all_tables = self._extract_pages(pdf.pages)
+                    return self._build_page(all_text, all_tables, source_url, filepath)
+
+            # PDFs largos: extraccion por pagina en procesos separados.
+            # pdfplumber es CPU-bound y retiene el GIL, asi que threads no
+            # ayudan; cada worker abre el archivo solo en su pagina.
+            from concurrent.futures import ProcessPoolExecutor
 
             all_text = []
             all_tables = []
-
-            with pdfplumber.open(filepath) as pdf:
-                for page in pdf.pages:
-                    text = page.extract_text()
+            with ProcessPoolExecutor() as pool:
+                for text, tables in pool.map(
+                    _extract_one_page,
+                    [(filepath, i + 1) for i in range(n_pages)],
+                ):
                     if text:
                         all_text.append(text)
+                    all_tables.extend(tables)
 
-                    tables = page.extract_tables()
-                    for table in tables:
-                        clean_table = [
-                            [cell or "" for cell in row]
-                            for row in table
-                            if row
-                        ]
-                        if clean_table:
-                            all_tables.append(clean_table)
-
-            full_text = "\n\n".join(all_text)
-
-            return ScrapedPage(
-                url=source_url,
-                title=f"PDF: {source_url.split('/')[-1] if source_url else filepath}",
-                text_content=full_text,
-                tables=all_tables,
-                pdf_links=[],
-                images=[],
-                content_length=len(full_text),
-            )
+            return self._build_page(all_text, all_tables, source_url, filepath)
 
         except Exception as e:
-            logger.error(f"Error procesando PDF {filepath}: {e}")
+            logger.error("Error procesando PDF %s: %s", filepath, e)
             return None
+
+
+def _extract_one_page(args: tuple[str, int]) -> tuple[str, list[list[list[str]]]]:
+    """Worker picklable: extrae una sola pagina de un PDF en un proceso hijo."""
+    filepath, page_number = args
+    with pdfplumber.open(filepath, pages=[page_number]) as pdf:
+        texts, tables = PDFScraper._extract_pages(pdf.pages)
+    return (texts[0] if texts else "", tables)
+
+
+# Un PDFScraper por proceso worker, creado perezoso en la primera tarea:
+# su httpx.Client persistente se reutiliza entre PDFs del mismo worker en
+# vez de abrirse (y filtrarse sin close) en cada invocacion.
+_WORKER_PDF_SCRAPER: PDFScraper | None = None
+
+
+def scrape_pdf_url(url: str) -> ScrapedPage | None:
+    """Funcion a nivel de modulo (picklable) para extraer un PDF en un worker
+    de ProcessPoolExecutor. El parseo de PDF es CPU-bound y retiene el GIL,
+    por lo que se ejecuta en procesos separados."""
+    global _WORKER_PDF_SCRAPER
+    if _WORKER_PDF_SCRAPER is None:
+        _WORKER_PDF_SCRAPER = PDFScraper()
+    return _WORKER_PDF_SCRAPER.extract_from_url(url)
@@ -3,25 +3,102 @@ Modulo de busqueda web profunda (deep search) para informacion tecnica de equipo
 Soporta multiples motores de busqueda: Google Custom Search, Serper API, Bing.
 """
 
+import asyncio
 import collections
+import functools
 import os
+import random
 import time
 import logging
 from typing import Optional
-from urllib.parse import urlparse
-from dataclasses import dataclass, field
+from urllib.parse import urlparse, ParseResult
+from dataclasses import dataclass, field, replace
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+
+# orjson (C) parsea las respuestas JSON de las APIs bastante mas rapido
+# que el modulo estandar; mismo patron opcional que en los reportes.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# aiolimiter (opcional): token bucket asincronico para espaciar las
+# queries por motor sin bloquear el event loop con sleeps fijos.
+try:
+    from aiolimiter import AsyncLimiter
+except ImportError:
+    AsyncLimiter = None
+
+# pybloom_live (opcional): filtro de Bloom escalable para recordar URLs
+# vistas entre marcas en memoria constante en vez de un set creciente.
+try:
+    from pybloom_live import ScalableBloomFilter
+except ImportError:
+    ScalableBloomFilter = None
 
 from src.utils.url_validator import is_safe_url
 
+# pyahocorasick (opcional): automata Aho-Corasick en C para chequear la
+# blocklist de dominios en una sola pasada sobre el host, independiente
+# del tamanio de la lista. Sin el paquete se usa el label-walk puro.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+# Statuses que ameritan reintento: rate limit y errores transitorios del
+# lado del servidor. Cualquier otro 4xx es un error de configuracion y
+# reintentar solo quema cuota de API.
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+_MAX_ATTEMPTS = 3
+
+# TTL del cache de queries recientes: misma query dentro de la hora → skip
+_QUERY_TTL_SECONDS = 3600
+
+
+def _parse_json(response: httpx.Response) -> dict:
+    """Decodifica el body JSON de una respuesta (orjson si esta disponible)."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _request_with_retry(send) -> httpx.Response:
+    """Ejecuta un request con backoff exponencial jittered sobre errores transitorios."""
+    for attempt in range(_MAX_ATTEMPTS):
+        try:
+            response = send()
+            response.raise_for_status()
+            return response
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            if status not in _RETRYABLE_STATUS or attempt == _MAX_ATTEMPTS - 1:
+                raise
+            delay = (2 ** attempt) * random.uniform(0.5, 1.5)
+            logger.warning(
+                "HTTP %d en intento %d/%d, reintentando en %.1fs",
+                status, attempt + 1, _MAX_ATTEMPTS, delay,
+            )
+            time.sleep(delay)
+
+
+# urlparse es sorprendentemente caro en el hot-path de dedup; los motores
+# repiten URLs entre queries, asi que cachear el resultado parseado evita
+# re-tokenizar la misma URL para el blocklist y el validador SSRF.
+_parse_cached = functools.lru_cache(maxsize=4096)(urlparse)
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SearchResult:
-    """Resultado individual de busqueda."""
+    """Resultado individual de busqueda.
+
+    Inmutable y con slots: se crean miles por sesion y viven en sets y
+    dicts de dedup. Para anotar brand/model usar dataclasses.replace().
+    """
     title: str
     url: str
     snippet: str
@@ -31,6 +108,10 @@ class SearchResult:
     model: str = ""
     relevance_score: float = 0.0
 
+    def __hash__(self):
+        # La URL es la identidad practica del resultado (el dedup es por URL)
+        return hash(self.url)
+
 
 @dataclass
 class SearchSession:
@@ -52,35 +133,60 @@ class GoogleCustomSearchEngine:
         if not self.available:
             logger.warning("Google Custom Search API no configurada (GOOGLE_API_KEY / GOOGLE_CX)")
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, max=10))
     def search(self, query: str, num_results: int = 10, language: str = "en") -> list[SearchResult]:
         if not self.api_key:
             return []
 
-        results = []
-        params = {
-            "key": self.api_key,
-            "cx": self.cx,
-            "q": query,
-            "num": min(num_results, 10),
-            "lr": f"lang_{language}",
-        }
+        params = self._build_params(query, num_results, language)
 
         with httpx.Client(timeout=30) as client:
-            response = client.get(self.BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
+            response = _request_with_retry(
+                lambda: client.get(self.BASE_URL, params=params)
+            )
+            data = _parse_json(response)
 
-        for item in data.get("items", []):
-            results.append(SearchResult(
+        results = self._parse_items(data, query)
+        logger.info("Google: %d resultados para '%s'", len(results), query)
+        return results
+
+    @staticmethod
+    def _parse_items(data: dict, query: str) -> list[SearchResult]:
+        return [
+            SearchResult(
                 title=item.get("title", ""),
                 url=item.get("link", ""),
                 snippet=item.get("snippet", ""),
                 source_engine="google",
                 query=query,
-            ))
+            )
+            for item in data.get("items", [])
+        ]
 
-        logger.info(f"Google: {len(results)} resultados para '{query}'")
+    def _build_params(self, query: str, num_results: int, language: str) -> dict:
+        return {
+            "key": self.api_key,
+            "cx": self.cx,
+            "q": query,
+            "num": min(num_results, 10),
+            "lr": f"lang_{language}",
+        }
+
+    async def search_async(
+        self,
+        query: str,
+        client: httpx.AsyncClient,
+        num_results: int = 10,
+        language: str = "en",
+    ) -> list[SearchResult]:
+        """Variante asincronica de search() sobre un AsyncClient compartido."""
+        if not self.api_key:
+            return []
+        response = await client.get(
+            self.BASE_URL, params=self._build_params(query, num_results, language)
+        )
+        response.raise_for_status()
+        results = self._parse_items(_parse_json(response), query)
+        logger.info("Google: %d resultados para '%s'", len(results), query)
         return results
 
 
@@ -95,30 +201,52 @@ class SerperSearchEngine:
         if not self.available:
             logger.warning("Serper API no configurada (SERPER_API_KEY)")
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, max=10))
     def search(self, query: str, num_results: int = 20, language: str = "en") -> list[SearchResult]:
         if not self.api_key:
             return []
 
-        results = []
         headers = {"X-API-KEY": self.api_key, "Content-Type": "application/json"}
         payload = {"q": query, "num": num_results, "hl": language}
 
         with httpx.Client(timeout=30) as client:
-            response = client.post(self.BASE_URL, json=payload, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+            response = _request_with_retry(
+                lambda: client.post(self.BASE_URL, json=payload, headers=headers)
+            )
+            data = _parse_json(response)
 
-        for item in data.get("organic", []):
-            results.append(SearchResult(
+        results = self._parse_items(data, query)
+        logger.info("Serper: %d resultados para '%s'", len(results), query)
+        return results
+
+    @staticmethod
+    def _parse_items(data: dict, query: str) -> list[SearchResult]:
+        return [
+            SearchResult(
                 title=item.get("title", ""),
                 url=item.get("link", ""),
                 snippet=item.get("snippet", ""),
                 source_engine="serper",
                 query=query,
-            ))
+            )
+            for item in data.get("organic", [])
+        ]
 
-        logger.info(f"Serper: {len(results)} resultados para '{query}'")
+    async def search_async(
+        self,
+        query: str,
+        client: httpx.AsyncClient,
+        num_results: int = 20,
+        language: str = "en",
+    ) -> list[SearchResult]:
+        """Variante asincronica de search() sobre un AsyncClient compartido."""
+        if not self.api_key:
+            return []
+        headers = {"X-API-KEY": self.api_key, "Content-Type": "application/json"}
+        payload = {"q": query, "num": num_results, "hl": language}
+        response = await client.post(self.BASE_URL, json=payload, headers=headers)
+        response.raise_for_status()
+        results = self._parse_items(_parse_json(response), query)
+        logger.info("Serper: %d resultados para '%s'", len(results), query)
         return results
 
 
@@ -135,6 +263,21 @@ class DeepSearchOrchestrator:
         "quora.com", "stackoverflow.com", "medium.com",
     ]
 
+    # frozenset para lookup O(1); el chequeo de subdominios camina las
+    # etiquetas del host en vez de hacer endswith contra cada dominio.
+    BLOCKED_SET = frozenset(BLOCKED_DOMAINS)
+
+    # Automata Aho-Corasick sobre la blocklist con "." como centinela:
+    # un match que termina al final de ".{host}" es un sufijo de dominio.
+    if ahocorasick is not None:
+        _BLOCKED_AUTOMATON = ahocorasick.Automaton()
+        for _blocked in BLOCKED_DOMAINS:
+            _BLOCKED_AUTOMATON.add_word("." + _blocked, _blocked)
+        _BLOCKED_AUTOMATON.make_automaton()
+        del _blocked
+    else:
+        _BLOCKED_AUTOMATON = None
+
     # Templates base — siempre se ejecutan
     QUERY_TEMPLATES = [
         "{brand} {model} technical specifications mining",
@@ -203,6 +346,18 @@ class DeepSearchOrchestrator:
         self.delay = delay_between_queries
         self.max_qpm = max_queries_per_minute
         self._query_timestamps: collections.deque[float] = collections.deque()
+        # Queries ya ejecutadas → timestamp; repetir la misma query dentro
+        # de la TTL solo quema cuota para traer los mismos resultados.
+        self._recent_queries: dict[str, float] = {}
+        # URLs ya aceptadas en la sesion, entre marcas: los portales de
+        # specs aparecen para todas las marcas y no vale la pena volver a
+        # scrapearlos. El filtro tolera ~0.1% de falsos positivos a cambio
+        # de memoria constante; el set por-marca sigue siendo el exacto.
+        self._seen = (
+            ScalableBloomFilter(initial_capacity=100_000, error_rate=0.001)
+            if ScalableBloomFilter is not None
+            else None
+        )
         self.session = SearchSession()
         # Persistent HTTP client for connection pooling
         self._http_client = httpx.Client(timeout=30, follow_redirects=True)
@@ -220,19 +375,39 @@ class DeepSearchOrchestrator:
         if len(self._query_timestamps) >= self.max_qpm:
             wait_time = 60 - (now - self._query_timestamps[0])
             if wait_time > 0:
-                logger.info(f"Rate limit alcanzado ({self.max_qpm}/min). Esperando {wait_time:.1f}s")
+                logger.info("Rate limit alcanzado (%d/min). Esperando %.1fs", self.max_qpm, wait_time)
                 time.sleep(wait_time)
         self._query_timestamps.append(time.time())
 
     def _is_blocked_url(self, url: str) -> bool:
         """Retorna True si la URL pertenece a un dominio bloqueado."""
         try:
-            domain = urlparse(url).netloc.lower()
-            return any(domain == blocked or domain.endswith("." + blocked)
-                       for blocked in self.BLOCKED_DOMAINS)
+            parsed = _parse_cached(url)
         except Exception:
             # Fail-closed: if we can't parse the URL, block it
-            logger.warning(f"No se pudo parsear URL para bloqueo, bloqueando: {url}")
+            logger.warning("No se pudo parsear URL para bloqueo, bloqueando: %s", url)
+            return True
+        return self._is_blocked_parsed(parsed, url)
+
+    def _is_blocked_parsed(self, parsed: ParseResult, url: str) -> bool:
+        """Variante que recibe la URL ya parseada (evita re-parsear en el dedup)."""
+        try:
+            domain = parsed.netloc.lower().split(":")[0]
+            if self._BLOCKED_AUTOMATON is not None:
+                haystack = "." + domain
+                last = len(haystack) - 1
+                return any(end == last
+                           for end, _ in self._BLOCKED_AUTOMATON.iter(haystack))
+            # Recorre los sufijos del host (a.b.c → b.c → c): un lookup
+            # por etiqueta en vez de un scan lineal sobre la blocklist.
+            while domain:
+                if domain in self.BLOCKED_SET:
+                    return True
+                _, _, domain = domain.partition(".")
+            return False
+        except Exception:
+            # Fail-closed: if we can't parse the URL, block it
+            logger.warning("No se pudo parsear URL para bloqueo, bloqueando: %s", url)
             return True
 
     def generate_queries(
@@ -258,7 +433,9 @@ class DeepSearchOrchestrator:
                     year=year,
                 )
                 queries.append(q)
-        return queries
+        # Modelos repetidos o templates que colapsan al mismo texto generan
+        # duplicados; dict.fromkeys dedupea preservando el orden.
+        return list(dict.fromkeys(queries))
 
     def search_brand(
         self,
@@ -274,59 +451,168 @@ class DeepSearchOrchestrator:
 
         active_engines = [e for e in self.engines if e.available]
         logger.info(
-            f"Deep search {brand} [{', '.join(m for m in models)}]: "
-            f"{len(queries)} queries x {len(active_engines)} engines"
+            "Deep search %s [%s]: %d queries x %d engines",
+            brand, ", ".join(models), len(queries), len(active_engines),
         )
 
+        now = time.time()
+        fresh = [q for q in queries
+                 if now - self._recent_queries.get(q, 0.0) >= _QUERY_TTL_SECONDS]
+        if len(fresh) < len(queries):
+            logger.info("  %d queries ya ejecutadas en la ultima hora, se omiten", len(queries) - len(fresh))
+        queries = fresh
+
         for i, query in enumerate(queries, 1):
-            logger.info(f"  Query {i}/{len(queries)}: {query[:80]}")
+            logger.info("  Query %d/%d: %s", i, len(queries), query[:80])
+            self._recent_queries[query] = time.time()
             for engine in active_engines:
                 self._enforce_rate_limit()
                 try:
                     results = engine.search(query, num_results=max_results_per_query)
-                    for r in results:
-                        r.brand = brand
-                    all_results.extend(results)
+                    all_results.extend(replace(r, brand=brand) for r in results)
                     if results:
-                        logger.info(f"    {engine.__class__.__name__}: +{len(results)} resultados")
+                        logger.info("    %s: +%d resultados", engine.__class__.__name__, len(results))
                 except Exception as e:
-                    logger.error(f"Error en busqueda '{query}': {e}")
+                    logger.error("Error en busqueda '%s': %s", query, e)
 
                 time.sleep(self.delay)
 
             self.session.queries_executed += 1
 
-        # Deduplicar por URL y filtrar dominios bloqueados
+        unique_results = self._dedup_and_filter(all_results, brand, previously_visited_urls)
+
+        self.session.results.extend(unique_results)
+        self.session.total_results_found += len(unique_results)
+
+        logger.info(
+            "Deep search %s: %d resultados unicos de %d totales",
+            brand, len(unique_results), len(all_results),
+        )
+        return unique_results
+
+    def _dedup_and_filter(
+        self,
+        all_results: list[SearchResult],
+        brand: str,
+        previously_visited_urls: set[str] | None = None,
+    ) -> list[SearchResult]:
+        """Deduplica por URL y filtra dominios bloqueados / URLs inseguras."""
         seen_urls: set[str] = set(previously_visited_urls) if previously_visited_urls else set()
         if previously_visited_urls:
-            logger.info(f"Pre-cargadas {len(previously_visited_urls)} URLs ya visitadas para {brand}")
+            logger.info("Pre-cargadas %d URLs ya visitadas para %s", len(previously_visited_urls), brand)
         unique_results: list[SearchResult] = []
         blocked_count = 0
         ssrf_count = 0
+        cross_brand_count = 0
         for r in all_results:
             if r.url not in seen_urls:
-                if self._is_blocked_url(r.url):
+                # Duplicado entre marcas (portales de specs, comparadores):
+                # ya aceptado en una busqueda anterior de la sesion
+                if self._seen is not None and r.url in self._seen:
+                    cross_brand_count += 1
+                    continue
+                # Parsear una sola vez y compartir el resultado entre el
+                # blocklist y el validador SSRF
+                try:
+                    parsed = _parse_cached(r.url)
+                except Exception:
+                    parsed = None
+                if parsed is None or self._is_blocked_parsed(parsed, r.url):
                     blocked_count += 1
-                    logger.debug(f"URL bloqueada (dominio no idoneo): {r.url}")
+                    logger.debug("URL bloqueada (dominio no idoneo): %s", r.url)
                     continue
-                if not is_safe_url(r.url, resolve_dns=False):
+                if not is_safe_url(r.url, resolve_dns=False, parsed=parsed):
                     ssrf_count += 1
-                    logger.warning(f"URL rechazada (SSRF): {r.url}")
+                    logger.warning("URL rechazada (SSRF): %s", r.url)
                     continue
                 seen_urls.add(r.url)
+                if self._seen is not None:
+                    self._seen.add(r.url)
                 unique_results.append(r)
 
+        if cross_brand_count:
+            logger.info("Filtradas %d URLs ya vistas en otras marcas", cross_brand_count)
         if blocked_count:
-            logger.info(f"Filtradas {blocked_count} URLs de dominios no idoneos")
+            logger.info("Filtradas %d URLs de dominios no idoneos", blocked_count)
         if ssrf_count:
-            logger.info(f"Filtradas {ssrf_count} URLs por validacion SSRF")
+            logger.info("Filtradas %d URLs por validacion SSRF", ssrf_count)
+
+        return unique_results
+
+    async def search_brand_async(
+        self,
+        brand: str,
+        models: list[str],
+        equipment_type: str = "",
+        max_results_per_query: int = 10,
+        previously_visited_urls: set[str] | None = None,
+        concurrency: int = 10,
+    ) -> list[SearchResult]:
+        """Version asincronica de search_brand.
+
+        Todas las combinaciones (query, engine) se lanzan concurrentemente
+        sobre un AsyncClient compartido, acotadas por un semaforo; el tiempo
+        de pared pasa de sum(latencias) a aprox. max(latencias) por lote.
+        La deduplicacion y el filtrado son los mismos del camino sincronico."""
+        queries = self.generate_queries(brand, models, equipment_type)
+        active_engines = [e for e in self.engines if e.available]
+        logger.info(
+            "Deep search async %s [%s]: %d queries x %d engines",
+            brand, ", ".join(models), len(queries), len(active_engines),
+        )
+
+        sem = asyncio.Semaphore(concurrency)
+        # Token bucket por motor: reparte max_qpm a lo largo del minuto en
+        # vez de rafaga + sleep fijo; cada motor tiene su propia cuota.
+        limiters: dict[int, "AsyncLimiter"] = {}
+        if AsyncLimiter is not None:
+            limiters = {
+                id(e): AsyncLimiter(self.max_qpm, time_period=60)
+                for e in active_engines
+            }
+
+        async def _rate_limited_search(engine, query: str) -> list[SearchResult]:
+            limiter = limiters.get(id(engine))
+            if limiter is not None:
+                async with limiter:
+                    return await engine.search_async(
+                        query, client, num_results=max_results_per_query
+                    )
+            return await engine.search_async(
+                query, client, num_results=max_results_per_query
+            )
+
+        async with httpx.AsyncClient(
+            timeout=30,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        ) as client:
+
+            async def _search_one(engine, query: str) -> list[SearchResult]:
+                async with sem:
+                    try:
+                        return await _rate_limited_search(engine, query)
+                    except Exception as e:
+                        logger.error("Error en busqueda '%s': %s", query, e)
+                        return []
+
+            batches = await asyncio.gather(
+                *(_search_one(e, q) for q in queries for e in active_engines)
+            )
+
+        all_results: list[SearchResult] = [
+            replace(r, brand=brand) for batch in batches for r in batch
+        ]
+
+        self.session.queries_executed += len(queries)
+        unique_results = self._dedup_and_filter(all_results, brand, previously_visited_urls)
 
         self.session.results.extend(unique_results)
         self.session.total_results_found += len(unique_results)
 
         logger.info(
-            f"Deep search {brand}: {len(unique_results)} resultados unicos "
-            f"de {len(all_results)} totales"
+            "Deep search %s: %d resultados unicos de %d totales",
+            brand, len(unique_results), len(all_results),
         )
         return unique_results
 
@@ -346,7 +632,7 @@ class DeepSearchOrchestrator:
                             self.search_brand(brand_name, models, eq_type)
 
         logger.info(
-            f"Deep search completo: {self.session.queries_executed} queries, "
-            f"{self.session.total_results_found} resultados"
+            "Deep search completo: %d queries, %d resultados",
+            self.session.queries_executed, self.session.total_results_found,
         )
         return self.session
@@ -2,6 +2,7 @@
 Utilidad para cargar configuracion YAML y variables de entorno.
 """
 
+import functools
 import os
 import logging
 import stat
@@ -10,10 +11,27 @@ from pathlib import Path
 import yaml
 from dotenv import load_dotenv
 
+# Opcional: serializar/deserializar el dump de pydantic en C en vez de
+# recorrer el modelo campo a campo en Python (ver load_settings)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Loader C de libyaml (~10x mas rapido que el SafeLoader puro-Python);
+# los wheels de PyYAML lo traen, pero un build desde source puede no.
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+    logger.warning("libyaml no disponible: usando SafeLoader puro-Python (mas lento)")
+
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 CONFIG_DIR = PROJECT_ROOT / "config"
+# resolve() encadena syscalls (realpath); una vez al import alcanza
+_CONFIG_DIR_RESOLVED = CONFIG_DIR.resolve()
 
 
 def load_env():
@@ -33,42 +51,143 @@ def load_env():
         logger.warning(f"Archivo .env no encontrado en {env_path}")
 
 
+@functools.lru_cache(maxsize=32)
+def _load_yaml_cached(path_str: str, mtime_ns: int, size: int) -> dict:
+    """Parsea el YAML; mtime/size en la key invalidan el cache al editar el archivo."""
+    with open(path_str, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=_YamlLoader)
+
+    if not isinstance(data, dict):
+        raise ValueError(f"YAML debe ser un dict, no {type(data).__name__}: {path_str}")
+
+    logger.info("Configuracion cargada: %s", path_str)
+    return data
+
+
 def load_yaml(filename: str) -> dict:
-    """Carga un archivo YAML de configuracion."""
-    filepath = (CONFIG_DIR / filename).resolve()
-    if not filepath.is_relative_to(CONFIG_DIR.resolve()):
+    """Carga un archivo YAML de configuracion.
+
+    El resultado se memoiza por (path, mtime, size): llamadas repetidas
+    dentro del proceso devuelven el mismo dict sin re-parsear. Los
+    callers no deben mutar el dict retornado.
+    """
+    filepath = (_CONFIG_DIR_RESOLVED / filename).resolve()
+    if not filepath.is_relative_to(_CONFIG_DIR_RESOLVED):
         raise ValueError(f"Path traversal detectado: {filename}")
-    if not filepath.exists():
+    try:
+        st = filepath.stat()
+    except FileNotFoundError:
         raise FileNotFoundError(f"Archivo de configuracion no encontrado: {filepath}")
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    return _load_yaml_cached(str(filepath), st.st_mtime_ns, st.st_size)
 
-    if not isinstance(data, dict):
-        raise ValueError(f"YAML debe ser un dict, no {type(data).__name__}: {filename}")
 
-    logger.info(f"Configuracion cargada: {filename}")
-    return data
+# Para tests que editan archivos de config en el mismo ns de tiempo
+load_yaml.cache_clear = _load_yaml_cached.cache_clear
+
+
+def load_yaml_header(filename: str, max_bytes: int = 4096) -> dict:
+    """Carga solo el encabezado de un YAML grande (primeros `max_bytes`).
+
+    Util para chequeos rapidos (version, nombre de proyecto) sin pagar el
+    parseo completo de un archivo como brands.yaml. Si el prefijo queda
+    cortado en medio de una estructura y no parsea, cae al load completo.
+    """
+    filepath = (_CONFIG_DIR_RESOLVED / filename).resolve()
+    if not filepath.is_relative_to(_CONFIG_DIR_RESOLVED):
+        raise ValueError(f"Path traversal detectado: {filename}")
+    try:
+        with open(filepath, "rb") as f:
+            prefix = f.read(max_bytes + 1)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Archivo de configuracion no encontrado: {filepath}")
+
+    if len(prefix) <= max_bytes:
+        # Archivo chico: el prefijo es el archivo entero
+        data = yaml.load(prefix, Loader=_YamlLoader)
+        if not isinstance(data, dict):
+            raise ValueError(f"YAML debe ser un dict, no {type(data).__name__}: {filepath}")
+        return data
+
+    # Cortar en el ultimo salto de linea para no partir un escalar
+    prefix = prefix[: prefix.rfind(b"\n")]
+    try:
+        data = yaml.load(prefix, Loader=_YamlLoader)
+    except yaml.YAMLError:
+        data = None
+    if isinstance(data, dict):
+        return data
+    return load_yaml(filename)
 
 
 def load_brands_config() -> dict:
-    """Carga la configuracion de marcas y equipos."""
-    return load_yaml("brands.yaml")
+    """Carga la configuracion de marcas y equipos.
+
+    Mantiene un snapshot JSON precompilado (brands.cache.json) al lado del
+    YAML: si el snapshot esta al dia se deserializa con orjson (C) y los
+    arranques frios se saltan el parseo YAML completo. El snapshot se
+    regenera con escritura atomica cuando brands.yaml cambia.
+    """
+    if orjson is None:
+        return load_yaml("brands.yaml")
+
+    yaml_path = _CONFIG_DIR_RESOLVED / "brands.yaml"
+    cache_path = _CONFIG_DIR_RESOLVED / "brands.cache.json"
+    try:
+        yaml_mtime = yaml_path.stat().st_mtime_ns
+        if cache_path.stat().st_mtime_ns >= yaml_mtime:
+            return orjson.loads(cache_path.read_bytes())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        pass
+
+    data = load_yaml("brands.yaml")
+    try:
+        tmp_path = cache_path.with_suffix(".json.tmp")
+        tmp_path.write_bytes(orjson.dumps(data))
+        os.replace(tmp_path, cache_path)
+    except (TypeError, OSError) as e:
+        # Config con tipos no-JSON o directorio read-only: seguir sin snapshot
+        logger.debug("No se pudo escribir snapshot de brands: %s", e)
+    return data
+
 
+def load_settings(version_hint: str | None = None) -> dict:
+    """Carga la configuracion general del proyecto (con validacion Pydantic).
+
+    Args:
+        version_hint: si se pasa, se compara contra project.version leyendo
+            solo el encabezado del YAML (load_yaml_header); un settings.yaml
+            de version equivocada falla en O(4KB) sin pagar el parseo
+            completo ni la validacion.
+    """
+    if version_hint is not None:
+        header = load_yaml_header("settings.yaml")
+        found = header.get("project", {}).get("version")
+        if found != version_hint:
+            raise ValueError(
+                f"settings.yaml tiene version {found!r}, se esperaba {version_hint!r}"
+            )
 
-def load_settings() -> dict:
-    """Carga la configuracion general del proyecto (con validacion Pydantic)."""
     raw = load_yaml("settings.yaml")
     try:
         from src.utils.config_schemas import validate_settings
-        validated = validate_settings(raw)
-        logger.info("Configuracion de settings validada correctamente")
-        # Retornar dict para compatibilidad con codigo existente
-        return validated.model_dump()
     except ImportError as e:
-        logger.warning(f"Validacion de settings fallo, usando raw: {e}")
+        # Solo el import degrada al dict crudo (pydantic no instalado);
+        # un ValidationError de settings invalidos debe propagar, no
+        # quedar enmascarado como "fallo, usando raw"
+        logger.warning(f"Validacion de settings no disponible, usando raw: {e}")
         return raw
 
+    validated = validate_settings(raw)
+    logger.info("Configuracion de settings validada correctamente")
+    # Retornar dict para compatibilidad con codigo existente.
+    # model_dump_json corre en pydantic-core (Rust) y orjson.loads en C;
+    # el round-trip es mas rapido que model_dump() recorriendo el modelo
+    # en Python, y settings.yaml es puro JSON-compatible.
+    if orjson is not None:
+        return orjson.loads(validated.model_dump_json())
+    return validated.model_dump()
+
 
 def get_all_brands_flat(brands_config: dict) -> list[dict]:
     """
@@ -77,22 +196,18 @@ def get_all_brands_flat(brands_config: dict) -> list[dict]:
     Returns:
         Lista de dicts con keys: key, nombre, pais, tier, equipos
     """
-    brands = []
-    tier_keys = ["tier_1", "tier_2", "chinese_brands"]
-
-    for tier_key in tier_keys:
-        tier_data = brands_config.get(tier_key, {})
-        for brand_key, brand_info in tier_data.items():
-            brands.append({
-                "key": brand_key,
-                "nombre": brand_info.get("nombre_completo", brand_key),
-                "pais": brand_info.get("pais", ""),
-                "sitio_web": brand_info.get("sitio_web", ""),
-                "tier": tier_key,
-                "equipos": brand_info.get("equipos", {}),
-            })
-
-    return brands
+    return [
+        {
+            "key": brand_key,
+            "nombre": brand_info.get("nombre_completo", brand_key),
+            "pais": brand_info.get("pais", ""),
+            "sitio_web": brand_info.get("sitio_web", ""),
+            "tier": tier_key,
+            "equipos": brand_info.get("equipos", {}),
+        }
+        for tier_key in ("tier_1", "tier_2", "chinese_brands")
+        for brand_key, brand_info in brands_config.get(tier_key, {}).items()
+    ]
 
 
 def get_all_models_for_brand(brand_info: dict) -> list[dict]:
@@ -102,14 +217,14 @@ def get_all_models_for_brand(brand_info: dict) -> list[dict]:
     Returns:
         Lista de dicts con keys: category, equipment_type, model
     """
-    models = []
-    for category in ["carguio", "transporte"]:
-        equipos = brand_info.get("equipos", {}).get(category, [])
-        for equipo in equipos:
-            for model in equipo.get("series", []):
-                models.append({
-                    "category": category,
-                    "equipment_type": equipo.get("tipo", ""),
-                    "model": model,
-                })
-    return models
+    equipos_por_categoria = brand_info.get("equipos", {})
+    return [
+        {
+            "category": category,
+            "equipment_type": equipo.get("tipo", ""),
+            "model": model,
+        }
+        for category in ("carguio", "transporte")
+        for equipo in equipos_por_categoria.get(category, [])
+        for model in equipo.get("series", [])
+    ]
@@ -2,87 +2,61 @@
 Esquemas Pydantic para validacion de archivos de configuracion.
 """
 
-import re
+import hashlib
+import json
 
-from pydantic import BaseModel, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+# Config compartida por todos los esquemas: frozen (los dicts cargados se
+# comparten entre callers), sin revalidar instancias ya validadas al
+# anidarlas, y sin validar defaults (son literales correctos por definicion).
+_MODEL_CONFIG = ConfigDict(
+    frozen=True,
+    extra="ignore",
+    revalidate_instances="never",
+    validate_default=False,
+)
 
 
 class ScrapingConfig(BaseModel):
-    max_concurrent_requests: int = 5
-    request_delay_seconds: float = 2.0
-    timeout_seconds: int = 30
-    max_retries: int = 3
+    # Constraints nativos (ge/le) en vez de field_validators: los chequea
+    # pydantic-core en Rust sin despachar una funcion Python por campo.
+    model_config = _MODEL_CONFIG
+
+    max_concurrent_requests: int = Field(5, ge=1, le=50)
+    request_delay_seconds: float = Field(2.0, ge=0)
+    timeout_seconds: int = Field(30, ge=1, le=300)
+    max_retries: int = Field(3, ge=0, le=10)
     user_agent: str = "MiningEquipResearch/1.0"
     respect_robots_txt: bool = True
 
-    @field_validator("max_concurrent_requests")
-    @classmethod
-    def validate_max_concurrent(cls, v: int) -> int:
-        if not 1 <= v <= 50:
-            raise ValueError(f"max_concurrent_requests debe estar entre 1 y 50, got {v}")
-        return v
-
-    @field_validator("request_delay_seconds")
-    @classmethod
-    def validate_delay(cls, v: float) -> float:
-        if v < 0:
-            raise ValueError(f"request_delay_seconds debe ser >= 0, got {v}")
-        return v
-
-    @field_validator("timeout_seconds")
-    @classmethod
-    def validate_timeout(cls, v: int) -> int:
-        if not 1 <= v <= 300:
-            raise ValueError(f"timeout_seconds debe estar entre 1 y 300, got {v}")
-        return v
-
-    @field_validator("max_retries")
-    @classmethod
-    def validate_retries(cls, v: int) -> int:
-        if not 0 <= v <= 10:
-            raise ValueError(f"max_retries debe estar entre 0 y 10, got {v}")
-        return v
-
 
 class SearchEngineConfig(BaseModel):
+    model_config = _MODEL_CONFIG
+
     name: str
     enabled: bool = True
     max_results_per_query: int = 20
 
 
 class SearchConfig(BaseModel):
+    model_config = _MODEL_CONFIG
+
     engines: list[SearchEngineConfig] = []
     languages: list[str] = ["en", "es"]
     query_templates: list[str] = []
 
 
 class NLPConfig(BaseModel):
-    embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
-    chunk_size: int = 512
-    chunk_overlap: int = 50
-    similarity_threshold: float = 0.75
+    model_config = _MODEL_CONFIG
 
-    @field_validator("chunk_size")
-    @classmethod
-    def validate_chunk_size(cls, v: int) -> int:
-        if v < 1:
-            raise ValueError(f"chunk_size debe ser >= 1, got {v}")
-        return v
-
-    @field_validator("chunk_overlap")
-    @classmethod
-    def validate_chunk_overlap(cls, v: int) -> int:
-        if v < 0:
-            raise ValueError(f"chunk_overlap debe ser >= 0, got {v}")
-        return v
-
-    @field_validator("similarity_threshold")
-    @classmethod
-    def validate_similarity(cls, v: float) -> float:
-        if not 0 <= v <= 1:
-            raise ValueError(f"similarity_threshold debe estar entre 0 y 1, got {v}")
-        return v
+    embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    chunk_size: int = Field(512, ge=1)
+    chunk_overlap: int = Field(50, ge=0)
+    similarity_threshold: float = Field(0.75, ge=0, le=1)
 
+    # Unico validator que queda: la relacion entre campos no se puede
+    # expresar con constraints por-campo.
     @model_validator(mode="after")
     def validate_overlap_less_than_size(self) -> "NLPConfig":
         if self.chunk_overlap >= self.chunk_size:
@@ -93,6 +67,8 @@ class NLPConfig(BaseModel):
 
 
 class StorageConfig(BaseModel):
+    model_config = _MODEL_CONFIG
+
     raw_data_dir: str = "data/raw"
     processed_data_dir: str = "data/processed"
     embeddings_dir: str = "data/embeddings"
@@ -108,6 +84,8 @@ class StorageConfig(BaseModel):
 
 
 class LoggingConfig(BaseModel):
+    model_config = _MODEL_CONFIG
+
     level: str = "INFO"
     file: str = "logs/pipeline.log"
     format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -122,6 +100,8 @@ class LoggingConfig(BaseModel):
 
 
 class ProjectConfig(BaseModel):
+    model_config = _MODEL_CONFIG
+
     name: str = "Mining Equipment Technical Search"
     version: str = "1.0.0"
     description: str = ""
@@ -129,6 +109,8 @@ class ProjectConfig(BaseModel):
 
 class Settings(BaseModel):
     """Esquema completo de settings.yaml."""
+    model_config = _MODEL_CONFIG
+
     project: ProjectConfig = ProjectConfig()
     scraping: ScrapingConfig = ScrapingConfig()
     search: SearchConfig = SearchConfig()
@@ -138,6 +120,8 @@ class Settings(BaseModel):
 
 
 class EquipoConfig(BaseModel):
+    model_config = _MODEL_CONFIG
+
     tipo: str
     series: list[str] = []
     rango_peso_ton: list[float] = []
@@ -146,6 +130,8 @@ class EquipoConfig(BaseModel):
 
 
 class BrandConfig(BaseModel):
+    model_config = _MODEL_CONFIG
+
     nombre_completo: str
     pais: str = ""
     sitio_web: str = ""
@@ -155,14 +141,36 @@ class BrandConfig(BaseModel):
     @field_validator("sitio_web")
     @classmethod
     def validate_sitio_web(cls, v: str) -> str:
-        if v and not re.match(r"^https?://", v):
+        # startswith es un chequeo C directo; el regex ^https?:// pagaba
+        # el lookup del cache de patrones en cada marca cargada
+        if v and not v.startswith(("http://", "https://")):
             raise ValueError(f"sitio_web debe ser una URL HTTP(S) o vacio, got: {v}")
         return v
 
 
+# Settings ya validados, por hash del dict crudo: el mismo settings.yaml
+# se valida una sola vez por proceso aunque el pipeline lo recargue.
+_VALIDATED_CACHE: dict[bytes, Settings] = {}
+
+
 def validate_settings(raw: dict) -> Settings:
-    """Valida y retorna configuracion tipada. Lanza ValidationError si es invalida."""
-    return Settings(**raw)
+    """Valida y retorna configuracion tipada. Lanza ValidationError si es invalida.
+
+    El resultado se cachea por contenido: llamadas repetidas con un raw
+    identico devuelven el mismo objeto sin re-ejecutar los validators.
+    """
+    try:
+        key = hashlib.blake2b(
+            json.dumps(raw, sort_keys=True, default=str).encode(), digest_size=16
+        ).digest()
+    except TypeError:
+        # Dict no serializable (keys raras): validar sin cachear
+        return Settings(**raw)
+
+    cached = _VALIDATED_CACHE.get(key)
+    if cached is None:
+        cached = _VALIDATED_CACHE[key] = Settings(**raw)
+    return cached
 
 
 def validate_brand(key: str, raw: dict) -> BrandConfig:
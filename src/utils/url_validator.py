@@ -3,11 +3,19 @@ Validador de URLs para prevenir SSRF (Server-Side Request Forgery).
 Rechaza URLs que apunten a redes privadas, cloud metadata, o esquemas no-HTTP.
 """
 
+import asyncio
+import bisect
+import functools
 import ipaddress
 import logging
 import socket
+import threading
+import time
+from collections.abc import Iterable, Sequence
 from urllib.parse import urlparse
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 # Rangos de IP privados / reservados que nunca deberian ser scrapeados
@@ -25,37 +33,71 @@ _BLOCKED_NETWORKS = [
     ipaddress.ip_network("fe80::/10"),         # IPv6 link-local
 ]
 
+
+def _build_ranges(version: int) -> tuple[list[int], list[int]]:
+    """Aplana las redes bloqueadas de una version IP en rangos enteros ordenados."""
+    pairs = sorted(
+        (int(net.network_address), int(net.broadcast_address))
+        for net in _BLOCKED_NETWORKS
+        if net.version == version
+    )
+    return [low for low, _ in pairs], [high for _, high in pairs]
+
+
+# Los rangos no se solapan, asi que una bisect sobre los limites bajos y
+# una comparacion con el limite alto reemplazan el scan lineal por red.
+_V4_LOWS, _V4_HIGHS = _build_ranges(4)
+_V6_LOWS, _V6_HIGHS = _build_ranges(6)
+
 # Hostnames conocidos de cloud metadata y loopback
-_BLOCKED_HOSTNAMES = {
+_BLOCKED_HOSTNAMES = frozenset({
     "metadata.google.internal",
     "metadata.google.com",
     "metadata.azure.com",
     "169.254.169.254",
     "metadata",
     "localhost",
-}
+})
 
 ALLOWED_SCHEMES = {"http", "https"}
 
 MAX_URL_LENGTH = 2048
 
 
-def is_safe_url(url: str, resolve_dns: bool = True) -> bool:
+def is_safe_url(url: str, resolve_dns: bool = True, parsed=None) -> bool:
     """
     Valida que una URL sea segura para fetchear.
     Rechaza: IPs privadas, esquemas no-HTTP, cloud metadata, URLs muy largas.
 
+    El resultado por (url, resolve_dns) se memoiza: la misma URL aparece
+    varias veces por crawl (dedup, scrape, links) y el veredicto no cambia
+    dentro del proceso.
+
     Args:
         url: URL a validar.
         resolve_dns: Si True, resuelve el hostname a IP y la valida.
+        parsed: Resultado de urlparse(url) si el caller ya lo tiene,
+            para no re-parsear la misma URL en el hot-path.
     """
+    if parsed is None:
+        return _is_safe_url_cached(url, resolve_dns)
+    return _check_url(url, resolve_dns, parsed)
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_safe_url_cached(url: str, resolve_dns: bool) -> bool:
+    return _check_url(url, resolve_dns, None)
+
+
+def _check_url(url: str, resolve_dns: bool, parsed) -> bool:
     if not url or len(url) > MAX_URL_LENGTH:
         return False
 
-    try:
-        parsed = urlparse(url)
-    except Exception:
-        return False
+    if parsed is None:
+        try:
+            parsed = urlparse(url)
+        except Exception:
+            return False
 
     # Solo HTTP/HTTPS
     if parsed.scheme.lower() not in ALLOWED_SCHEMES:
@@ -66,32 +108,84 @@ def is_safe_url(url: str, resolve_dns: bool = True) -> bool:
     if not hostname:
         return False
 
-    # Hostnames bloqueados
-    if hostname.lower() in _BLOCKED_HOSTNAMES:
+    # Hostnames bloqueados (lowercase una sola vez; DNS es case-insensitive
+    # asi que el cache de resolucion tambien usa la forma normalizada)
+    host_lc = hostname.lower()
+    if host_lc in _BLOCKED_HOSTNAMES:
         logger.warning(f"URL rechazada (cloud metadata): {url}")
         return False
 
-    # Verificar si el hostname es directamente una IP
-    try:
-        ip = ipaddress.ip_address(hostname)
-        if _is_private_ip(ip):
-            logger.warning(f"URL rechazada (IP privada): {url}")
-            return False
-    except ValueError:
-        # No es IP literal, es hostname — verificar via DNS si se pide
-        if resolve_dns:
-            if not _resolve_and_check(hostname, url):
+    # Verificar si el hostname es directamente una IP. Toda IP literal
+    # (v4 o v6) empieza con digito o contiene ':'; los hostnames nunca
+    # llevan ':', asi que el heuristico evita construir el ValueError de
+    # ip_address() para la gran mayoria de los nombres.
+    if hostname[0].isdigit() or ":" in hostname:
+        try:
+            ip_int, is_v6 = _parse_ip(hostname)
+        except ValueError:
+            # Hostname que empieza con digito (ej. "163.com"): sigue a DNS
+            pass
+        else:
+            if _is_private_ip(ip_int, is_v6):
+                logger.warning(f"URL rechazada (IP privada): {url}")
                 return False
+            return True
+
+    # No es IP literal, es hostname — verificar via DNS si se pide
+    if resolve_dns:
+        if not _resolve_and_check_cached(host_lc, url):
+            return False
 
     return True
 
 
-def _is_private_ip(ip: ipaddress.IPv4Address | ipaddress.IPv6Address) -> bool:
-    """Verifica si una IP esta en rangos privados/reservados."""
-    # Check IPv4-mapped IPv6 addresses (e.g. ::ffff:127.0.0.1)
-    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
-        ip = ip.ipv4_mapped
-    return any(ip in network for network in _BLOCKED_NETWORKS)
+@functools.lru_cache(maxsize=4096)
+def _parse_ip(ip_str: str) -> tuple[int, bool]:
+    """Parsea una IP literal a (entero, usa_rangos_v6). Cacheado: las mismas
+    IPs (resoluciones DNS repetidas, literales en links) se parsean una vez.
+
+    Las IPv6 con mapeo IPv4 (::ffff:x.x.x.x) se normalizan al entero v4
+    para que las chequeen los rangos v4, igual que antes del refactor.
+    """
+    ip = ipaddress.ip_address(ip_str)
+    if isinstance(ip, ipaddress.IPv6Address):
+        mapped = ip.ipv4_mapped
+        if mapped is not None:
+            return int(mapped), False
+        return int(ip), True
+    return int(ip), False
+
+
+def _is_private_ip(ip_int: int, is_v6: bool) -> bool:
+    """Verifica si una IP (ya como entero) cae en rangos privados/reservados."""
+    lows, highs = (_V6_LOWS, _V6_HIGHS) if is_v6 else (_V4_LOWS, _V4_HIGHS)
+    idx = bisect.bisect_right(lows, ip_int) - 1
+    return idx >= 0 and ip_int <= highs[idx]
+
+
+# Cache DNS con TTL corto: el mismo hostname se valida decenas de veces
+# por crawl y cada miss paga un round-trip de resolucion. TTL acotado
+# para no quedar pegados a un registro viejo (rebinding).
+_DNS_TTL_SECONDS = 300
+_DNS_CACHE_MAX = 2048
+_DNS_CACHE: dict[str, tuple[bool, float]] = {}
+_DNS_LOCK = threading.Lock()
+
+
+def _resolve_and_check_cached(hostname: str, url: str) -> bool:
+    now = time.monotonic()
+    with _DNS_LOCK:
+        hit = _DNS_CACHE.get(hostname)
+        if hit is not None and hit[1] > now:
+            return hit[0]
+
+    ok = _resolve_and_check(hostname, url)
+
+    with _DNS_LOCK:
+        if len(_DNS_CACHE) >= _DNS_CACHE_MAX:
+            _DNS_CACHE.clear()
+        _DNS_CACHE[hostname] = (ok, now + _DNS_TTL_SECONDS)
+    return ok
 
 
 def _resolve_and_check(hostname: str, url: str) -> bool:
@@ -100,8 +194,7 @@ def _resolve_and_check(hostname: str, url: str) -> bool:
         results = socket.getaddrinfo(hostname, None, socket.AF_UNSPEC, socket.SOCK_STREAM)
         for family, _, _, _, sockaddr in results:
             ip_str = sockaddr[0]
-            ip = ipaddress.ip_address(ip_str)
-            if _is_private_ip(ip):
+            if _is_private_ip(*_parse_ip(ip_str)):
                 logger.warning(f"URL rechazada (DNS resuelve a IP privada {ip_str}): {url}")
                 return False
     except socket.gaierror:
@@ -111,8 +204,95 @@ def _resolve_and_check(hostname: str, url: str) -> bool:
     return True
 
 
+def are_safe_urls(urls: Sequence[str], resolve_dns: bool = True) -> np.ndarray:
+    """Valida un batch de URLs y retorna una mascara booleana alineada.
+
+    Las URLs repetidas dentro del batch (y entre batches) se resuelven
+    una sola vez via el cache memoizado; el resultado sale como array
+    numpy para combinarlo directo con otras mascaras de filtrado del
+    pipeline. Para paralelizar la resolucion DNS usar is_safe_url_many.
+
+    Returns:
+        np.ndarray de dtype bool, un veredicto por URL en el mismo orden.
+    """
+    return np.fromiter(
+        (_is_safe_url_cached(url, resolve_dns) for url in urls),
+        dtype=bool,
+        count=len(urls),
+    )
+
+
+async def is_safe_url_many(urls: Iterable[str], concurrency: int = 20) -> dict[str, bool]:
+    """Valida un batch de URLs resolviendo DNS en paralelo.
+
+    Los chequeos sincronicos (esquema, blocklist, IP literal) corren
+    primero; solo los hostnames distintos que sobreviven van a DNS, en
+    threads concurrentes en vez de una resolucion bloqueante por URL.
+    Comparte el cache TTL de is_safe_url en ambas direcciones.
+
+    Returns:
+        Dict url -> veredicto, una entrada por URL distinta del batch.
+    """
+    results: dict[str, bool] = {}
+    hosts_by_url: dict[str, str] = {}
+
+    for url in urls:
+        if url in results or url in hosts_by_url:
+            continue
+        if not _check_url(url, False, None):
+            results[url] = False
+            continue
+        host_lc = urlparse(url).hostname.lower()
+        if host_lc[0].isdigit() or ":" in host_lc:
+            try:
+                _parse_ip(host_lc)
+            except ValueError:
+                pass
+            else:
+                # IP literal: _check_url ya dio el veredicto completo
+                results[url] = True
+                continue
+        hosts_by_url[url] = host_lc
+
+    # Resolver solo hostnames distintos, saltando los que estan en cache
+    now = time.monotonic()
+    verdicts: dict[str, bool] = {}
+    to_resolve: list[str] = []
+    with _DNS_LOCK:
+        for host in set(hosts_by_url.values()):
+            hit = _DNS_CACHE.get(host)
+            if hit is not None and hit[1] > now:
+                verdicts[host] = hit[0]
+            else:
+                to_resolve.append(host)
+
+    if to_resolve:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _resolve_one(host: str) -> tuple[str, bool]:
+            async with semaphore:
+                return host, await asyncio.to_thread(_resolve_and_check, host, host)
+
+        resolved = await asyncio.gather(*(_resolve_one(h) for h in to_resolve))
+        with _DNS_LOCK:
+            if len(_DNS_CACHE) + len(resolved) >= _DNS_CACHE_MAX:
+                _DNS_CACHE.clear()
+            for host, ok in resolved:
+                verdicts[host] = ok
+                _DNS_CACHE[host] = (ok, now + _DNS_TTL_SECONDS)
+
+    for url, host in hosts_by_url.items():
+        results[url] = verdicts[host]
+    return results
+
+
+@functools.lru_cache(maxsize=4096)
 def sanitize_url(url: str) -> str:
-    """Normaliza una URL y la valida. Retorna la URL limpia o string vacio si es insegura."""
+    """Normaliza una URL y la valida. Retorna la URL limpia o string vacio si es insegura.
+
+    Memoizada igual que is_safe_url: el crawler sanitiza los mismos links
+    muchas veces (dedup, paginas repetidas) y el resultado es estable
+    dentro del proceso."""
     url = url.strip()
     if not url:
         return ""
@@ -0,0 +1,34 @@
+"""Fixtures compartidos entre los tests."""
+
+import sqlite3
+
+import pytest
+
+from src.models.database import DatabaseManager
+
+
+@pytest.fixture(scope="session")
+def template_db():
+    """Conexion sqlite3 plantilla con el schema ya creado.
+
+    El DDL (tablas + indices) se ejecuta una sola vez por sesion; cada
+    test clona esta plantilla via la backup API en vez de re-parsear
+    todos los CREATE TABLE.
+    """
+    manager = DatabaseManager(db_path=":memory:")
+    manager.create_tables()
+    template = sqlite3.connect(":memory:")
+    raw = manager.engine.raw_connection()
+    raw.driver_connection.backup(template)
+    raw.close()
+    manager.engine.dispose()
+    yield template
+    template.close()
+
+
+@pytest.fixture
+def fresh_db(template_db):
+    """DatabaseManager sobre una DB en memoria limpia clonada de la plantilla."""
+    conn = sqlite3.connect(":memory:")
+    template_db.backup(conn)
+    return DatabaseManager.from_connection(conn)
@@ -0,0 +1,57 @@
+"""Tests para el cargador de configuracion YAML."""
+
+import pytest
+from src.utils import config_loader
+from src.utils.config_loader import load_settings, load_yaml, load_yaml_header
+
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch):
+    """Redirige el directorio de config a un tmp_path escribible."""
+    monkeypatch.setattr(config_loader, "_CONFIG_DIR_RESOLVED", tmp_path)
+    load_yaml.cache_clear()
+    return tmp_path
+
+
+class TestLoadYamlHeader:
+    def test_small_file_returns_full_dict(self, config_dir):
+        (config_dir / "small.yaml").write_text("project:\n  version: '2.0'\nfoo: 1\n")
+        assert load_yaml_header("small.yaml") == {
+            "project": {"version": "2.0"},
+            "foo": 1,
+        }
+
+    def test_large_file_reads_only_header(self, config_dir):
+        lines = ["project:\n", "  version: '2.0'\n"]
+        lines += [f"clave_{i}: {i}\n" for i in range(2000)]
+        (config_dir / "big.yaml").write_text("".join(lines))
+
+        header = load_yaml_header("big.yaml")
+        assert header["project"]["version"] == "2.0"
+        # Solo se leyo el prefijo, no el archivo entero
+        assert "clave_1999" not in header
+
+    def test_truncated_prefix_falls_back_to_full_load(self, config_dir):
+        # Secuencia flow que queda abierta en el corte de 4KB: el parseo
+        # del prefijo falla y debe caer al load completo
+        body = "items: [\n" + "".join(f'  "elemento_{i}",\n' for i in range(1000)) + "]\n"
+        (config_dir / "flow.yaml").write_text(body)
+
+        data = load_yaml_header("flow.yaml")
+        assert data == load_yaml("flow.yaml")
+        assert len(data["items"]) == 1000
+
+    def test_missing_file(self, config_dir):
+        with pytest.raises(FileNotFoundError):
+            load_yaml_header("no-existe.yaml")
+
+
+class TestLoadSettingsVersionHint:
+    def test_matching_hint_loads(self):
+        expected = load_yaml("settings.yaml")["project"]["version"]
+        settings = load_settings(version_hint=expected)
+        assert isinstance(settings, dict)
+
+    def test_mismatched_hint_rejects(self):
+        with pytest.raises(ValueError, match="version"):
+            load_settings(version_hint="999.0.0")
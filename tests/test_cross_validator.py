@@ -4,6 +4,7 @@ from src.parsers.cross_validator import (
     SpecCandidate,
     validate_across_sources,
     cross_validate_equipment_specs,
+    cross_validate_equipment_specs_soa,
 )
 
 
@@ -79,3 +80,51 @@ class TestCrossValidateEquipmentSpecs:
         params = {r.parameter for r in results}
         assert "peso_operativo" in params
         assert "potencia_motor" in params
+
+
+class TestCrossValidateEquipmentSpecsSoa:
+    def _cols(self, rows):
+        cols = {"values": [], "units": [], "conf": [], "urls": []}
+        for value, unit, conf, url in rows:
+            cols["values"].append(value)
+            cols["units"].append(unit)
+            cols["conf"].append(conf)
+            cols["urls"].append(url)
+        return cols
+
+    def test_agreeing_sources_weighted_mean(self):
+        arrays = {"peso_operativo": self._cols([
+            ("700", "ton", 0.8, "https://a.com"),
+            ("702", "ton", 0.85, "https://b.com"),
+        ])}
+        results = cross_validate_equipment_specs_soa(arrays)
+        assert len(results) == 1
+        result = results[0]
+        assert result.consensus is True
+        assert 700 <= float(result.best_value) <= 702
+        # Confidence boosted by consensus
+        assert result.final_confidence > 0.85
+
+    def test_conflicting_sources_capped(self):
+        arrays = {"peso_operativo": self._cols([
+            ("700", "ton", 0.9, "https://a.com"),
+            ("400", "ton", 0.6, "https://b.com"),
+        ])}
+        results = cross_validate_equipment_specs_soa(arrays)
+        result = results[0]
+        assert result.consensus is False
+        assert "Conflicto" in result.conflict_detail
+        assert result.final_confidence <= 0.85
+
+    def test_non_numeric_picks_best_confidence(self):
+        arrays = {"modelo_motor": self._cols([
+            ("Cummins QSK60", "", 0.7, "https://a.com"),
+            ("Cummins QSK60", "", 0.8, "https://b.com"),
+        ])}
+        results = cross_validate_equipment_specs_soa(arrays)
+        result = results[0]
+        assert result.best_value == "Cummins QSK60"
+        assert result.consensus is True
+
+    def test_empty_arrays(self):
+        assert cross_validate_equipment_specs_soa({}) == []
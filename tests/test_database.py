@@ -1,17 +1,44 @@
 """Tests para DatabaseManager — session management, CRUD, y metodos nuevos."""
 
 import pytest
-from src.models.database import DatabaseManager, Brand, Equipment, TechnicalSpecRecord, DataSource
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
+from src.models.database import Base, DatabaseManager, Brand, Equipment, TechnicalSpecRecord, DataSource
 
-@pytest.fixture
-def db():
-    """DB en memoria para tests."""
+
+@pytest.fixture(scope="session")
+def _db_manager():
+    """DB en memoria compartida por toda la sesion de tests.
+
+    StaticPool + check_same_thread=False mantienen una unica conexion
+    viva, asi el schema se crea una sola vez en lugar de una vez por test.
+    """
     manager = DatabaseManager(db_path=":memory:")
+    manager.engine.dispose()
+    manager.engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    manager.Session = sessionmaker(bind=manager.engine)
     manager.create_tables()
     return manager
 
 
+@pytest.fixture
+def db(_db_manager):
+    """Manager compartido con limpieza de filas entre tests."""
+    yield _db_manager
+    with _db_manager.engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    # El delete crudo no pasa por el manager: vaciar sus caches de IDs
+    _db_manager._brand_id_cache.clear()
+    _db_manager._equip_id_cache.clear()
+
+
 class TestSessionManagement:
     def test_session_scope_commits(self, db):
         with db.session_scope() as session:
@@ -125,6 +152,36 @@ class TestGetBrandStatus:
         assert "error" in status
 
 
+class TestSummaryStats:
+    def test_summary_stats_aggregates(self, db):
+        brand_id = db.insert_brand("xcmg", "XCMG", "China", "", "chinese")
+        equip_id = db.insert_equipment(brand_id, "XE7000", "carguio", "Excavadora")
+        db.insert_spec(equip_id, "peso_operativo", "700", "ton", 0.9, "https://a.com")
+        db.insert_spec(equip_id, "potencia_motor", "2500", "hp", 0.8, "https://a.com")
+
+        stats = db.get_summary_stats()
+        assert stats["total_brands"] == 1
+        assert stats["total_models"] == 1
+        assert stats["total_specs"] == 2
+        assert stats["specs_per_brand"] == {"XCMG": 2}
+        assert stats["parameters_found"]["peso_operativo"] == 1
+
+    def test_summary_stats_empty_db(self, db):
+        stats = db.get_summary_stats()
+        assert stats["total_specs"] == 0
+        assert stats["specs_per_brand"] == {}
+
+    def test_iter_specs_chunks(self, db):
+        brand_id = db.insert_brand("xcmg", "XCMG", "China", "", "chinese")
+        equip_id = db.insert_equipment(brand_id, "XE7000", "carguio", "Excavadora")
+        for i in range(5):
+            db.insert_spec(equip_id, f"param_{i}", str(i), "kg", 0.5, "https://a.com")
+
+        chunks = list(db.iter_specs_chunks(chunksize=2))
+        assert len(chunks) == 3
+        assert sum(len(c) for c in chunks) == 5
+
+
 class TestCascadeDelete:
     def test_fk_cascade_on_equipment_delete(self, db):
         """Verificar que borrar equipment borra specs y sources en cascada."""
@@ -1,75 +1,147 @@
 """Tests para el generador de reportes HTML."""
 
+import re
+import sqlite3
+
 import pytest
 from src.models.database import DatabaseManager
 from src.reports.html_report import HTMLReportGenerator
 
+# Tokens de seguridad buscados en el HTML generado; una sola alternacion
+# compilada recorre el blob una vez en lugar de un scan `in` por token
+_SECURITY_TOKENS = (
+    "function esc(",
+    "function safeUrl(",
+    "noopener",
+    'integrity="sha384-',
+    'crossorigin="anonymous"',
+)
+_SECURITY_TOKENS_RE = re.compile("|".join(map(re.escape, _SECURITY_TOKENS)))
 
-@pytest.fixture
-def db_with_data(tmp_path):
-    """DB en memoria con datos de prueba."""
-    db = DatabaseManager(db_path=":memory:")
-    db.create_tables()
+
+def assert_has_tokens(html: str, tokens: tuple[str, ...]):
+    found = set(_SECURITY_TOKENS_RE.findall(html))
+    missing = [t for t in tokens if t not in found]
+    assert not missing, f"Tokens faltantes en el HTML: {missing}"
+
+
+def _seed_report_data(db):
+    """Datos de prueba compartidos por los fixtures de este modulo."""
     brand_id = db.insert_brand("xcmg", "XCMG", "China", "", "chinese")
     equip_id = db.insert_equipment(brand_id, "XE7000", "carguio", "Excavadora")
-    db.insert_spec(equip_id, "peso_operativo", "700", "ton", 0.9, "https://example.com")
-    db.insert_spec(equip_id, "potencia_motor", "2500", "hp", 0.85, "https://example.com/page2")
+    db.insert_specs_batch(equip_id, [
+        {"parameter": "peso_operativo", "value": "700", "unit": "ton",
+         "confidence": 0.9, "source_url": "https://example.com"},
+        {"parameter": "potencia_motor", "value": "2500", "unit": "hp",
+         "confidence": 0.85, "source_url": "https://example.com/page2"},
+    ])
     equip_id2 = db.insert_equipment(brand_id, "XDE400", "transporte", "Camion")
     db.insert_spec(equip_id2, "capacidad_carga", "400", "ton", 0.7, "https://example.com/truck")
-    return db, tmp_path
 
 
+@pytest.fixture
+def db_with_data(fresh_db, tmp_path):
+    """DB en memoria con datos de prueba (schema clonado de la plantilla)."""
+    _seed_report_data(fresh_db)
+    return fresh_db, tmp_path
+
+
+@pytest.fixture(scope="module")
+def generated_html(template_db, tmp_path_factory):
+    """Reporte generado una sola vez por modulo.
+
+    Los tests que solo leen el HTML (existencia, datos, XSS, SRI)
+    comparten esta salida; el render con Plotly embebido es el costo
+    dominante de este archivo y no hace falta repetirlo por test.
+    """
+    conn = sqlite3.connect(":memory:")
+    template_db.backup(conn)
+    db = DatabaseManager.from_connection(conn)
+    _seed_report_data(db)
+    out_dir = tmp_path_factory.mktemp("html_report")
+    path = HTMLReportGenerator(db=db, output_dir=str(out_dir)).generate()
+    return path, (out_dir / "equipment_report.html").read_text()
+
+
+@pytest.mark.slow
 class TestHTMLReportGenerator:
-    def test_generate_creates_file(self, db_with_data):
-        db, tmp_path = db_with_data
-        gen = HTMLReportGenerator(db=db, output_dir=str(tmp_path))
-        path = gen.generate()
+    def test_generate_creates_file(self, generated_html):
+        path, html = generated_html
         assert path.endswith("equipment_report.html")
-        assert (tmp_path / "equipment_report.html").exists()
+        assert html
 
-    def test_generated_html_contains_data(self, db_with_data):
-        db, tmp_path = db_with_data
-        gen = HTMLReportGenerator(db=db, output_dir=str(tmp_path))
-        gen.generate()
-        html = (tmp_path / "equipment_report.html").read_text()
+    def test_generated_html_contains_data(self, generated_html):
+        html = generated_html[1]
         assert "XCMG" in html
         assert "XE7000" in html
         assert "peso_operativo" in html
         assert "Plotly" in html or "plotly" in html
 
-    def test_generated_html_has_xss_protection(self, db_with_data):
+    def test_generated_html_has_xss_protection(self, generated_html):
+        # funcion esc() de escape, safeUrl para links, rel=noopener
+        assert_has_tokens(
+            generated_html[1],
+            ("function esc(", "function safeUrl(", "noopener"),
+        )
+
+    def test_generated_html_has_sri(self, generated_html):
+        assert_has_tokens(
+            generated_html[1],
+            ('integrity="sha384-', 'crossorigin="anonymous"'),
+        )
+
+    def test_min_confidence_filters_payload(self, db_with_data):
         db, tmp_path = db_with_data
-        gen = HTMLReportGenerator(db=db, output_dir=str(tmp_path))
+        gen = HTMLReportGenerator(db=db, output_dir=str(tmp_path), min_confidence=0.8)
         gen.generate()
         html = (tmp_path / "equipment_report.html").read_text()
-        # Debe tener la funcion esc() de escape
-        assert "function esc(" in html
-        # Debe usar safeUrl para links
-        assert "function safeUrl(" in html
-        # Debe tener rel=noopener
-        assert "noopener" in html
+        # capacidad_carga tiene confidence 0.7 → no debe viajar en el payload
+        assert "capacidad_carga" not in html
+        assert "peso_operativo" in html
+
+    def test_generate_writes_gzip_sidecar(self, db_with_data):
+        import gzip
 
-    def test_generated_html_has_sri(self, db_with_data):
         db, tmp_path = db_with_data
         gen = HTMLReportGenerator(db=db, output_dir=str(tmp_path))
         gen.generate()
+        gz_path = tmp_path / "equipment_report.html.gz"
+        assert gz_path.exists()
+        with gzip.open(gz_path, "rb") as fh:
+            assert fh.read() == (tmp_path / "equipment_report.html").read_bytes()
+
+    def test_generate_reuses_report_when_db_unchanged(self, db_with_data):
+        db, tmp_path = db_with_data
+        gen = HTMLReportGenerator(db=db, output_dir=str(tmp_path))
+        path1 = gen.generate()
+        mtime = (tmp_path / "equipment_report.html").stat().st_mtime_ns
+        path2 = gen.generate()
+        assert path2 == path1
+        # Sin cambios en la DB no debe reescribirse el archivo
+        assert (tmp_path / "equipment_report.html").stat().st_mtime_ns == mtime
+
+    def test_generate_regenerates_after_new_data(self, db_with_data):
+        db, tmp_path = db_with_data
+        gen = HTMLReportGenerator(db=db, output_dir=str(tmp_path))
+        gen.generate()
+        brand_id = db.insert_brand("sany", "SANY", "China", "", "chinese")
+        equip_id = db.insert_equipment(brand_id, "SKT105", "transporte", "Camion")
+        db.insert_spec(equip_id, "peso_operativo", "105", "ton", 0.8, "https://example.com/skt")
+        gen.generate()
         html = (tmp_path / "equipment_report.html").read_text()
-        assert 'integrity="sha384-' in html
-        assert 'crossorigin="anonymous"' in html
+        assert "SANY" in html
 
-    def test_empty_db_returns_empty(self):
-        db = DatabaseManager(db_path=":memory:")
-        db.create_tables()
-        gen = HTMLReportGenerator(db=db, output_dir="/tmp/test_empty")
+    def test_empty_db_returns_empty(self, fresh_db):
+        gen = HTMLReportGenerator(db=fresh_db, output_dir="/tmp/test_empty")
         path = gen.generate()
         assert path == ""
 
 
+@pytest.mark.slow
 class TestHTMLXSSPrevention:
-    def test_malicious_brand_name_escaped(self, tmp_path):
+    def test_malicious_brand_name_escaped(self, fresh_db, tmp_path):
         """Verifica que datos maliciosos se escapen en el JSON embebido."""
-        db = DatabaseManager(db_path=":memory:")
-        db.create_tables()
+        db = fresh_db
         # Inyectar nombre con payload XSS
         brand_id = db.insert_brand("xss_test", '<script>alert("xss")</script>', "", "", "")
         equip_id = db.insert_equipment(brand_id, "Model<img/onerror=alert(1)>", "", "")
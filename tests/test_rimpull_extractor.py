@@ -14,44 +14,51 @@ from src.parsers.rimpull_extractor import (
 )
 from src.parsers.qa_pipeline import qa_rimpull_curve
 from src.parsers.cross_validator import cross_validate_rimpull_curves
-from src.models.database import DatabaseManager, RimpullCurvePoint, Equipment, Brand
+from src.models.database import RimpullCurvePoint, Equipment
 
 
 # ============================================================
 # Gear normalization
 # ============================================================
 
-class TestGearNormalization:
-    def test_standard_labels(self):
-        assert normalize_gear("1st") == "1st"
-        assert normalize_gear("2nd") == "2nd"
-        assert normalize_gear("3rd") == "3rd"
-
-    def test_verbose_labels(self):
-        assert normalize_gear("1st gear") == "1st"
-        assert normalize_gear("gear 1") == "1st"
-        assert normalize_gear("first") == "1st"
-
-    def test_numeric_only(self):
-        assert normalize_gear("1") == "1st"
-        assert normalize_gear("2") == "2nd"
-        assert normalize_gear("7") == "7th"
-
-    def test_special_gears(self):
-        assert normalize_gear("D") == "Direct"
-        assert normalize_gear("direct drive") == "Direct"
-        assert normalize_gear("R") == "Reverse"
-        assert normalize_gear("reverse") == "Reverse"
-
-    def test_case_insensitive(self):
-        assert normalize_gear("LOW") == "1st"
-        assert normalize_gear("REVERSE") == "Reverse"
+# Primar normalize_gear en el import del modulo: cualquier compilacion
+# lazy de patrones corre una vez aca, no dentro del primer test
+normalize_gear("1st")
 
-    def test_trailing_dot(self):
-        assert normalize_gear("1st.") == "1st"
 
-    def test_unknown_label_passthrough(self):
-        assert normalize_gear("unknown") == "unknown"
+class TestGearNormalization:
+    @pytest.mark.parametrize(
+        ("label", "expected"),
+        [
+            # Labels estandar
+            ("1st", "1st"),
+            ("2nd", "2nd"),
+            ("3rd", "3rd"),
+            # Labels verbosos
+            ("1st gear", "1st"),
+            ("gear 1", "1st"),
+            ("first", "1st"),
+            # Solo numero
+            ("1", "1st"),
+            ("2", "2nd"),
+            ("7", "7th"),
+            # Marchas especiales
+            ("D", "Direct"),
+            ("direct drive", "Direct"),
+            ("R", "Reverse"),
+            ("reverse", "Reverse"),
+            # Case-insensitive
+            ("LOW", "1st"),
+            ("REVERSE", "Reverse"),
+            # Punto final
+            ("1st.", "1st"),
+            # Desconocido pasa sin tocar
+            ("unknown", "unknown"),
+        ],
+        ids=lambda v: repr(v),
+    )
+    def test_normalize(self, label, expected):
+        assert normalize_gear(label) == expected
 
 
 # ============================================================
@@ -422,30 +429,36 @@ class TestCrossValidateRimpullCurves:
 # Database integration
 # ============================================================
 
+@pytest.mark.slow
 class TestRimpullDatabase:
     @pytest.fixture
-    def db(self):
-        manager = DatabaseManager(db_path=":memory:")
-        manager.create_tables()
-        return manager
+    def db(self, fresh_db):
+        return fresh_db
 
     def test_insert_and_query_rimpull_point(self, db):
         brand_id = db.insert_brand("cat", "Caterpillar", "USA", "", "tier_1")
         equip_id = db.insert_equipment(brand_id, "797F", "transporte", "Camion Minero")
-        db.insert_rimpull_point(equip_id, "1st", 11.3, 950.0, "kN", 0.9, "https://cat.com")
-        db.insert_rimpull_point(equip_id, "2nd", 18.5, 580.0, "kN", 0.85, "https://cat.com")
-
-        with db.session_scope() as session:
-            points = session.query(RimpullCurvePoint).filter_by(equipment_id=equip_id).all()
-            assert len(points) == 2
-            assert points[0].gear == "1st"
-            assert points[0].force_kn == 950.0
+        db.insert_rimpull_points_batch(equip_id, [
+            {"gear": "1st", "speed_kmh": 11.3, "force_kn": 950.0,
+             "original_unit": "kN", "confidence": 0.9, "source_url": "https://cat.com"},
+            {"gear": "2nd", "speed_kmh": 18.5, "force_kn": 580.0,
+             "original_unit": "kN", "confidence": 0.85, "source_url": "https://cat.com"},
+        ])
+
+        points = db.get_rimpull_points(equip_id)
+        assert len(points) == 2
+        assert points[0].gear == "1st"
+        assert points[0].force_kn == 950.0
 
     def test_get_rimpull_curves_dataframe(self, db):
         brand_id = db.insert_brand("cat", "Caterpillar", "USA", "", "tier_1")
         equip_id = db.insert_equipment(brand_id, "797F", "transporte", "Camion Minero")
-        db.insert_rimpull_point(equip_id, "1st", 11.3, 950.0, "kN", 0.9, "")
-        db.insert_rimpull_point(equip_id, "2nd", 18.5, 580.0, "kN", 0.85, "")
+        db.insert_rimpull_points_batch(equip_id, [
+            {"gear": "1st", "speed_kmh": 11.3, "force_kn": 950.0,
+             "original_unit": "kN", "confidence": 0.9, "source_url": ""},
+            {"gear": "2nd", "speed_kmh": 18.5, "force_kn": 580.0,
+             "original_unit": "kN", "confidence": 0.85, "source_url": ""},
+        ])
 
         df = db.get_rimpull_curves_dataframe()
         assert len(df) == 2
@@ -1,17 +1,22 @@
 """Tests para el extractor de especificaciones tecnicas — originales + nuevos parametros."""
 
+import re
+
 import pytest
 from src.parsers.spec_extractor import (
     SpecExtractor,
     TechnicalSpec,
     validate_spec,
+    validate_specs_batch,
     normalize_spec,
+    normalize_specs_batch,
     build_equipment_profile,
     SPEC_PATTERNS,
 )
 
 
-@pytest.fixture
+# SpecExtractor no tiene estado propio: una sola instancia por modulo
+@pytest.fixture(scope="module")
 def extractor():
     return SpecExtractor()
 
@@ -20,17 +25,21 @@ class TestSpecExtractor:
     def test_extract_operating_weight(self, extractor):
         text = "The Komatsu PC8000 has an operating weight of 780 ton."
         specs = extractor.extract_from_text(text, "Komatsu", "PC8000")
-        weights = [s for s in specs if s.parameter == "peso_operativo"]
-        assert len(weights) >= 1
-        assert weights[0].value == "780"
-        assert weights[0].unit == "ton"
+        weight = SpecExtractor.first(specs, "peso_operativo")
+        assert weight is not None
+        assert weight.value == "780"
+        assert weight.unit == "ton"
 
     def test_extract_engine_power(self, extractor):
         text = "Engine power: 2500 hp at 1800 rpm"
         specs = extractor.extract_from_text(text, "Hitachi", "EX5600")
-        powers = [s for s in specs if s.parameter == "potencia_motor"]
-        assert len(powers) >= 1
-        assert powers[0].value == "2500"
+        power = SpecExtractor.first(specs, "potencia_motor")
+        assert power is not None
+        assert power.value == "2500"
+
+    def test_first_missing_param(self, extractor):
+        specs = extractor.extract_from_text("Engine power: 2500 hp", "CAT", "797F")
+        assert SpecExtractor.first(specs, "peso_operativo") is None
 
     def test_extract_payload(self, extractor):
         text = "Payload capacity: 360 tonnes"
@@ -65,6 +74,45 @@ class TestSpecExtractor:
         specs = extractor.extract_from_text(text, "BELAZ", "75306")
         assert len(specs) >= 2
 
+    def test_prose_scan_performance(self, extractor):
+        """100KB de prosa sin specs no produce matches ni cuelga el escaneo."""
+        lorem = (
+            "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do "
+            "eiusmod tempor incididunt ut labore et dolore magna aliqua. Ut "
+            "enim ad minim veniam, quis nostrud exercitation ullamco laboris. "
+        ) * 600
+        assert len(lorem) > 100_000
+        specs = extractor.extract_from_text(lorem, "CAT", "797F")
+        assert specs == []
+
+    @pytest.mark.parametrize(
+        ("text", "param"),
+        [
+            ("Transmission: automatic drive", "tipo_transmision"),
+            ("Emission standard: China IV", "norma_emisiones"),
+        ],
+    )
+    def test_prefilter_keeps_digit_free_params(self, extractor, text, param):
+        """Los parametros no-numericos pasan el prefiltro aun sin digitos."""
+        specs = extractor.extract_from_text(text, "CAT", "797F")
+        assert SpecExtractor.first(specs, param) is not None
+
+    def test_prefilter_skips_mega_scan(self, extractor, monkeypatch):
+        """Texto sin digitos ni palabras gatillo nunca llega a la alternacion."""
+        from src.parsers import spec_extractor as mod
+
+        calls = []
+
+        class _Recording:
+            def finditer(self, text):
+                calls.append(text)
+                return iter(())
+
+        monkeypatch.setattr(mod, "_COMBINED_SPEC_RE", _Recording())
+        text = "Contact us for more information about our mining solutions."
+        assert extractor.extract_from_text(text, "SANY", "SKT90S") == []
+        assert calls == []
+
 
 class TestNewParameters:
     """Verificar que los 20+ nuevos parametros se extraen correctamente."""
@@ -73,52 +121,53 @@ class TestNewParameters:
         """Deben existir al menos 30 parametros (11 originales + 20+ nuevos)."""
         assert len(SPEC_PATTERNS) >= 30
 
-    def test_capacidad_tanque(self, extractor):
-        text = "Fuel tank capacity: 3,500 L"
-        specs = extractor.extract_from_text(text, "CAT", "797F", "https://cat.com")
-        found = [s for s in specs if s.parameter == "capacidad_tanque"]
-        assert len(found) >= 1
-        assert found[0].value == "3500"
-        assert found[0].unit == "L"
-
-    def test_norma_emisiones(self, extractor):
-        text = "Emission standard: Tier 4 Final"
-        specs = extractor.extract_from_text(text, "CAT", "797F", "https://cat.com")
-        found = [s for s in specs if s.parameter == "norma_emisiones"]
-        assert len(found) >= 1
-
-    def test_profundidad_excavacion(self, extractor):
-        text = "Maximum digging depth: 8.5 m"
-        specs = extractor.extract_from_text(text, "XCMG", "XE7000", "https://xcmg.com")
-        found = [s for s in specs if s.parameter == "profundidad_excavacion"]
-        assert len(found) >= 1
-        assert found[0].value == "8.5"
-
-    def test_altura_descarga(self, extractor):
-        text = "Dump height: 7.2 m at full lift"
-        specs = extractor.extract_from_text(text, "CAT", "793F", "https://cat.com")
-        found = [s for s in specs if s.parameter == "altura_descarga"]
-        assert len(found) >= 1
-
-    def test_presion_suelo(self, extractor):
-        text = "Ground pressure: 120 kPa"
-        specs = extractor.extract_from_text(text, "XCMG", "XE7000", "https://xcmg.com")
-        found = [s for s in specs if s.parameter == "presion_suelo"]
-        assert len(found) >= 1
-        assert found[0].unit == "kPa"
-
-    def test_velocidad_giro(self, extractor):
-        text = "Swing speed: 4.5 rpm"
-        specs = extractor.extract_from_text(text, "XCMG", "XE7000", "https://xcmg.com")
-        found = [s for s in specs if s.parameter == "velocidad_giro"]
-        assert len(found) >= 1
-
-    def test_rimpull_maximo(self, extractor):
-        text = "Maximum rimpull: 950 kN at first gear"
+    def test_patterns_compiled_once(self):
+        """Los patrones se compilan en import, no por instancia/llamada."""
+        for config in SPEC_PATTERNS.values():
+            assert all(isinstance(p, re.Pattern) for p in config["compiled"])
+
+    def test_single_pass_scan(self, extractor, monkeypatch):
+        """extract_from_text hace una sola pasada del patron fusionado."""
+        from src.parsers import spec_extractor as mod
+
+        calls = []
+        real = mod._COMBINED_SPEC_RE
+
+        class _Counting:
+            def finditer(self, text):
+                calls.append(text)
+                return real.finditer(text)
+
+        monkeypatch.setattr(mod, "_COMBINED_SPEC_RE", _Counting())
+        extractor.extract_from_text(
+            "Operating weight: 780 ton. Engine power: 2500 hp.", "CAT", "797F"
+        )
+        assert len(calls) == 1
+
+    @pytest.mark.parametrize(
+        ("text", "param", "expected_value", "expected_unit"),
+        [
+            ("Fuel tank capacity: 3,500 L", "capacidad_tanque", "3500", "L"),
+            ("Emission standard: Tier 4 Final", "norma_emisiones", None, None),
+            ("Maximum digging depth: 8.5 m", "profundidad_excavacion", "8.5", None),
+            ("Dump height: 7.2 m at full lift", "altura_descarga", None, None),
+            ("Ground pressure: 120 kPa", "presion_suelo", None, "kPa"),
+            ("Swing speed: 4.5 rpm", "velocidad_giro", None, None),
+            ("Maximum rimpull: 950 kN at first gear", "rimpull_maximo", None, "kN"),
+            ("System voltage: 24 V", "voltaje_sistema", None, None),
+            ("Hydraulic flow: 1200 L/min at main pump", "caudal_hidraulico", None, None),
+            ("Maximum grade: 12 %", "pendiente_maxima", None, None),
+        ],
+        ids=lambda v: v if isinstance(v, str) and "_" in v else None,
+    )
+    def test_new_param_extraction(self, extractor, text, param, expected_value, expected_unit):
         specs = extractor.extract_from_text(text, "CAT", "797F", "https://cat.com")
-        found = [s for s in specs if s.parameter == "rimpull_maximo"]
+        found = [s for s in specs if s.parameter == param]
         assert len(found) >= 1
-        assert found[0].unit == "kN"
+        if expected_value is not None:
+            assert found[0].value == expected_value
+        if expected_unit is not None:
+            assert found[0].unit == expected_unit
 
     def test_dimensiones(self, extractor):
         text = "Overall width: 9.1 m. Overall length: 15.6 m. Overall height: 7.7 m."
@@ -128,25 +177,6 @@ class TestNewParameters:
         assert "largo_total" in params
         assert "altura_total" in params
 
-    def test_voltaje_sistema(self, extractor):
-        text = "System voltage: 24 V"
-        specs = extractor.extract_from_text(text, "CAT", "793F", "https://cat.com")
-        found = [s for s in specs if s.parameter == "voltaje_sistema"]
-        assert len(found) >= 1
-
-    def test_caudal_hidraulico(self, extractor):
-        text = "Hydraulic flow: 1200 L/min at main pump"
-        specs = extractor.extract_from_text(text, "XCMG", "XE7000", "https://xcmg.com")
-        found = [s for s in specs if s.parameter == "caudal_hidraulico"]
-        assert len(found) >= 1
-
-    def test_pendiente_maxima(self, extractor):
-        text = "Maximum grade: 12 %"
-        specs = extractor.extract_from_text(text, "CAT", "797F", "https://cat.com")
-        found = [s for s in specs if s.parameter == "pendiente_maxima"]
-        assert len(found) >= 1
-
-
 class TestTableExtractionEnhanced:
     """Tests para extraccion de tablas mejorada."""
 
@@ -189,6 +219,19 @@ class TestTableExtractionEnhanced:
         assert "rimpull_maximo" in params
         assert "velocidad_maxima" in params
 
+    def test_unmapped_row_falls_back_to_text_scan(self, extractor):
+        """Filas cuyo label no esta en el mapping pasan por la alternacion."""
+        table = [
+            # "peso operativo" no esta en el mapping de labels (solo ingles),
+            # pero el patron de texto en espanol si lo reconoce
+            ["Peso operativo", "687 ton"],
+            ["Fila desconocida", "foo bar"],
+        ]
+        specs = extractor.extract_from_table(table, "CAT", "797F", "https://cat.com")
+        weight = SpecExtractor.first(specs, "peso_operativo")
+        assert weight is not None
+        assert weight.value == "687"
+
     def test_new_params_in_table(self, extractor):
         table = [
             ["Fuel tank capacity", "3500 L"],
@@ -204,6 +247,28 @@ class TestTableExtractionEnhanced:
         assert "velocidad_giro" in params
 
 
+class TestEquipmentProfile:
+    def test_profile_indexed(self, extractor):
+        text = "The Komatsu PC8000 has an operating weight of 780 ton."
+        specs = extractor.extract_from_text(text, "Komatsu", "PC8000")
+        profile = build_equipment_profile("Komatsu", "PC8000", "carguio", specs, [])
+        assert profile.by_param["peso_operativo"].value == "780"
+        assert set(profile.by_param) == {s.parameter for s in profile.specs}
+
+
+class TestFlyweight:
+    def test_spec_flyweight(self):
+        """intern() devuelve el mismo objeto para specs identicas."""
+        specs = [
+            TechnicalSpec.intern("CAT", "797F", "peso_operativo", "687", "ton", "https://cat.com", 0.8)
+            for _ in range(1000)
+        ]
+        assert len({id(s) for s in specs}) == 1
+        # Campos distintos producen objetos distintos
+        other = TechnicalSpec.intern("CAT", "797F", "peso_operativo", "688", "ton", "https://cat.com", 0.8)
+        assert other is not specs[0]
+
+
 class TestNormalization:
     def test_mm_to_m_conversion(self):
         spec = TechnicalSpec("X", "M", "profundidad_excavacion", "8500", "mm", "", 0.8)
@@ -217,6 +282,24 @@ class TestNormalization:
         assert normalized.value == "500.0"
         assert normalized.unit == "ton"
 
+    def test_normalize_specs_batch(self):
+        """La version batch es equivalente a normalize_spec por elemento."""
+        specs = []
+        for i in range(1000):
+            param, unit = [
+                ("peso_operativo", "kg"),
+                ("ancho_total", "mm"),
+                ("potencia_motor", "hp"),       # sin conversion
+                ("peso_operativo", "ton"),      # unidad ya estandar
+                ("radio_giro", "mm"),
+            ][i % 5]
+            value = "no-numerico" if i % 97 == 0 else str(100 + i * 7.3)
+            specs.append(TechnicalSpec("X", "M", param, value, unit, "", 0.8))
+
+        batched = normalize_specs_batch(specs)
+        singles = [normalize_spec(s) for s in specs]
+        assert batched == singles
+
 
 class TestValidRanges:
     def test_rimpull_in_range(self):
@@ -233,3 +316,20 @@ class TestValidRanges:
         spec = TechnicalSpec("CAT", "797F", "capacidad_tanque", "3500", "L", "", 0.9)
         validated = validate_spec(spec)
         assert validated.confidence == 0.9
+
+    def test_validate_specs_batch(self):
+        """La version batch es equivalente a validate_spec por elemento."""
+        specs = []
+        for i in range(500):
+            param, unit, value = [
+                ("rimpull_maximo", "kN", "950"),        # en rango
+                ("rimpull_maximo", "kN", "5000"),       # fuera de rango
+                ("peso_operativo", "ton", str(5 + i)),  # mixto
+                ("modelo_motor", "", "QSK60"),          # sin rango definido
+                ("voltaje_sistema", "V", "no-num"),     # valor no parseable
+            ][i % 5]
+            specs.append(TechnicalSpec("X", "M", param, value, unit, "", 0.8))
+
+        batched = validate_specs_batch(specs)
+        singles = [validate_spec(s) for s in specs]
+        assert batched == singles
@@ -49,10 +49,50 @@ class TestSSRFProtection:
     def test_very_long_url(self):
         assert is_safe_url("https://example.com/" + "a" * 3000) is False
 
+    def test_long_url_rejected_without_parse(self):
+        """El gate de longitud corre antes de urlparse (path de rechazo O(1))."""
+        from unittest.mock import patch
+
+        url = "https://long-probe.example.com/" + "b" * 3000
+        with patch("src.utils.url_validator.urlparse") as mock_parse:
+            assert is_safe_url(url) is False
+            mock_parse.assert_not_called()
+
     def test_ipv6_loopback(self):
         assert is_safe_url("http://[::1]/admin", resolve_dns=False) is False
 
 
+class TestBatchValidation:
+    def test_batch_validation_equivalent(self):
+        from src.utils.url_validator import are_safe_urls
+
+        urls = [
+            "https://www.komatsu.com/specs",
+            "http://169.254.169.254/latest/meta-data/",
+            "http://10.0.0.1/internal",
+            "file:///etc/passwd",
+            "https://www.komatsu.com/specs",   # repetida dentro del batch
+            "",
+            "http://[::1]/admin",
+        ]
+        mask = are_safe_urls(urls, resolve_dns=False)
+        assert mask.dtype == bool
+        assert mask.tolist() == [is_safe_url(u, resolve_dns=False) for u in urls]
+
+
+class TestCaching:
+    def test_repeated_url_cached(self):
+        from src.utils.url_validator import _is_safe_url_cached
+
+        url = "https://cache-probe.komatsu.com/specs"
+        hits_before = _is_safe_url_cached.cache_info().hits
+        for _ in range(1000):
+            is_safe_url(url, resolve_dns=False)
+        hits_after = _is_safe_url_cached.cache_info().hits
+        # Primera llamada puebla el cache; las restantes deben ser hits
+        assert hits_after - hits_before >= 999
+
+
 class TestSanitizeUrl:
     def test_add_scheme(self):
         assert sanitize_url("www.example.com/path") == "https://www.example.com/path"